@@ -0,0 +1,34 @@
+"""
+In-process lookup caches for OSTicket API v2
+
+Ticket statuses are a handful of rows that only change from the osTicket
+admin panel, so they are loaded once at startup and resolved from a dict
+instead of being joined or lazy-loaded per ticket.
+"""
+
+from typing import Dict, TYPE_CHECKING
+from sqlalchemy import select
+from sqlalchemy.orm import Session, undefer_group
+import structlog
+
+if TYPE_CHECKING:
+    from .models import TicketStatus
+
+logger = structlog.get_logger()
+
+STATUS_BY_ID: Dict[int, "TicketStatus"] = {}
+
+def load_lookup_tables(session: Session) -> None:
+    """(Re)load the status cache; call again after admin changes"""
+    from .models import TicketStatus
+
+    statuses = session.scalars(select(TicketStatus).options(undefer_group("content"))).all()
+
+    # Cached instances outlive the session, so detach them fully loaded
+    for status in statuses:
+        session.expunge(status)
+
+    STATUS_BY_ID.clear()
+    STATUS_BY_ID.update((status.id, status) for status in statuses)
+
+    logger.info("Lookup tables cached", statuses=len(STATUS_BY_ID))
@@ -3,12 +3,15 @@ Authentication utilities and token management for OSTicket API v2
 """
 
 import hashlib
+import hmac
 import json
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, Union
-from jose import jwt, JWTError
+from jose import jwk, jwt, JWTError
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload, selectinload
 from ..models.auth import AuthToken, ExternalIdentity
 from ..models.core import ApiKey
 from ..models.staff import Staff
@@ -22,6 +25,10 @@ logger = structlog.get_logger()
 # Password context for OSTicket compatibility
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+def _strict_loading() -> tuple:
+    """Loader options that make unplanned lazy loads raise when STRICT_ORM_LOADING is on"""
+    return (raiseload("*"),) if settings.STRICT_ORM_LOADING else ()
+
 class TokenManager:
     """Manage JWT tokens and authentication"""
     
@@ -30,6 +37,8 @@ class TokenManager:
         self.algorithm = settings.JWT_ALGORITHM
         self.access_token_expire_minutes = settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
         self.refresh_token_expire_days = settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS
+        # Build the key object once; jose would otherwise reconstruct it for every encode/decode
+        self.signing_key = jwk.construct(self.secret_key, self.algorithm)
     
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """Create JWT access token"""
@@ -41,7 +50,7 @@ class TokenManager:
             expire = datetime.utcnow() + timedelta(minutes=self.access_token_expire_minutes)
         
         to_encode.update({"exp": expire, "type": "access"})
-        encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
+        encoded_jwt = jwt.encode(to_encode, self.signing_key, algorithm=self.algorithm)
         return encoded_jwt
     
     def create_refresh_token(self, data: dict) -> str:
@@ -49,13 +58,13 @@ class TokenManager:
         to_encode = data.copy()
         expire = datetime.utcnow() + timedelta(days=self.refresh_token_expire_days)
         to_encode.update({"exp": expire, "type": "refresh"})
-        encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
+        encoded_jwt = jwt.encode(to_encode, self.signing_key, algorithm=self.algorithm)
         return encoded_jwt
     
     def verify_token(self, token: str) -> Dict[str, Any]:
         """Verify and decode JWT token"""
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            payload = jwt.decode(token, self.signing_key, algorithms=[self.algorithm])
             return payload
         except JWTError as e:
             logger.warning("JWT verification failed", error=str(e))
@@ -78,9 +87,8 @@ class OSTicketPasswordVerifier:
             
             # Try MD5 (legacy OSTicket) - NOTE: This is insecure
             if len(hashed_password) == 32:
-                import hashlib
-                md5_hash = hashlib.md5(plain_password.encode()).hexdigest()
-                return md5_hash == hashed_password
+                md5_hash = hashlib.md5(plain_password.encode()).digest()
+                return hmac.compare_digest(md5_hash, bytes.fromhex(hashed_password))
                 
             # Default to bcrypt
             return pwd_context.verify(plain_password, hashed_password)
@@ -92,19 +100,21 @@ class OSTicketPasswordVerifier:
 class AuthenticationService:
     """Main authentication service supporting multiple auth methods"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
-        self.token_manager = TokenManager()
+        self.token_manager = token_manager
         self.password_verifier = OSTicketPasswordVerifier()
     
-    def authenticate_api_key(self, api_key: str, ip_address: str) -> Optional[Dict[str, Any]]:
+    async def authenticate_api_key(self, api_key: str, ip_address: str) -> Optional[Dict[str, Any]]:
         """Authenticate using OSTicket API key"""
         try:
             # Query API key from database
-            db_api_key = self.db.query(ApiKey).filter(
-                ApiKey.apikey == api_key,
-                ApiKey.isactive == True
-            ).first()
+            db_api_key = await self.db.scalar(
+                select(ApiKey).where(
+                    ApiKey.apikey == api_key,
+                    ApiKey.isactive == True
+                )
+            )
             
             if not db_api_key:
                 logger.warning("API key not found", api_key=api_key[:8] + "...")
@@ -134,14 +144,13 @@ class AuthenticationService:
             logger.error("API key authentication error", error=str(e))
             return None
     
-    def authenticate_staff(self, username: str, password: str) -> Optional[Dict[str, Any]]:
+    async def authenticate_staff(self, username: str, password: str) -> Optional[Dict[str, Any]]:
         """Authenticate staff user with username/password"""
         try:
             # Query staff from database
-            staff = self.db.query(Staff).filter(
-                Staff.username == username,
-                Staff.isactive == True
-            ).first()
+            staff = await self.db.scalar(
+                select(Staff).where(Staff.username == username, Staff.isactive == True)
+            )
             
             if not staff:
                 logger.warning("Staff user not found", username=username)
@@ -170,33 +179,26 @@ class AuthenticationService:
             logger.error("Staff authentication error", error=str(e))
             return None
     
-    def authenticate_user(self, email: str, password: str) -> Optional[Dict[str, Any]]:
+    async def authenticate_user(self, email: str, password: str) -> Optional[Dict[str, Any]]:
         """Authenticate end user with email/password"""
         try:
-            # First find the user by email address
-            user_email = self.db.query(UserEmail).filter(
-                UserEmail.address == email
-            ).first()
-            
-            if not user_email:
+            # Resolve email -> user -> account in a single round trip
+            row = (await self.db.execute(
+                select(UserAccount, User)
+                .join(User, User.id == UserAccount.user_id)
+                .join(UserEmail, UserEmail.user_id == User.id)
+                .where(UserEmail.address == email)
+                .options(*_strict_loading())  # Only columns are read
+                .limit(1)
+            )).first()
+            
+            if not row:
                 logger.warning("User email not found", email=email)
                 return None
             
-            # Get the user record
-            user = self.db.query(User).filter(
-                User.id == user_email.user_id
-            ).first()
+            user_account, user = row
             
-            if not user:
-                logger.warning("User not found for email", email=email, user_id=user_email.user_id)
-                return None
-            
-            # Check if user account exists and get password
-            user_account = self.db.query(UserAccount).filter(
-                UserAccount.user_id == user.id
-            ).first()
-            
-            if not user_account or not user_account.passwd:
+            if not user_account.passwd:
                 logger.warning("User account not found or no password", user_id=user.id)
                 return None
             
@@ -220,7 +222,7 @@ class AuthenticationService:
             logger.error("User authentication error", error=str(e))
             return None
     
-    def authenticate_external_identity(self, provider: str, external_user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def authenticate_external_identity(self, provider: str, external_user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Authenticate using external identity provider (IdP verifies identity, roles internal)"""
         try:
             external_user_id = external_user_data.get("id") or external_user_data.get("sub")
@@ -231,20 +233,21 @@ class AuthenticationService:
                 return None
             
             # Look for existing external identity mapping
-            external_identity = self.db.query(ExternalIdentity).filter(
-                ExternalIdentity.provider == provider,
-                ExternalIdentity.external_user_id == external_user_id
-            ).first()
+            external_identity = await self.db.scalar(
+                select(ExternalIdentity).where(
+                    ExternalIdentity.provider == provider,
+                    ExternalIdentity.external_user_id == external_user_id
+                )
+            )
             
             if external_identity:
                 # Update external identity data
                 external_identity.external_email = external_email
                 external_identity.external_name = external_user_data.get("name")
-                external_identity.updated = datetime.utcnow()
-                self.db.commit()
+                await self.db.commit()
                 
                 # Get OSTicket user data based on mapping
-                osticket_user = self._get_osticket_user(
+                osticket_user = await self._get_osticket_user(
                     external_identity.osticket_user_type, 
                     external_identity.osticket_user_id
                 )
@@ -278,11 +281,11 @@ class AuthenticationService:
             logger.error("External identity authentication error", error=str(e))
             return None
     
-    def _get_osticket_user(self, user_type: str, user_id: int) -> Optional[Dict[str, Any]]:
+    async def _get_osticket_user(self, user_type: str, user_id: int) -> Optional[Dict[str, Any]]:
         """Get OSTicket user data by type and ID"""
         try:
             if user_type == "staff":
-                staff = self.db.query(Staff).filter(Staff.staff_id == user_id).first()
+                staff = await self.db.get(Staff, user_id)
                 if staff:
                     return {
                         "user_type": "staff",
@@ -296,13 +299,14 @@ class AuthenticationService:
                         "isadmin": staff.isadmin
                     }
             elif user_type == "user":
-                user = self.db.query(User).filter(User.id == user_id).first()
+                user = await self.db.scalar(
+                    select(User)
+                    .where(User.id == user_id)
+                    .options(selectinload(User.default_email), *_strict_loading())
+                )
                 if user:
                     # Get primary email address
-                    user_email = self.db.query(UserEmail).filter(
-                        UserEmail.user_id == user.id
-                    ).first()
-                    email = user_email.address if user_email else None
+                    email = user.default_email.address if user.default_email else None
                     
                     return {
                         "user_type": "user",
@@ -369,7 +373,7 @@ class AuthenticationService:
     
     def _store_auth_token(self, user_data: Dict[str, Any], token: str, token_type: str,
                          session_id: str = None, ip_address: str = None, user_agent: str = None):
-        """Store authentication token in database"""
+        """Stage authentication token on the session; the caller commits"""
         try:
             import uuid
             token_hash = self.token_manager.hash_token(token)
@@ -394,11 +398,9 @@ class AuthenticationService:
             )
             
             self.db.add(auth_token)
-            self.db.commit()
             
         except Exception as e:
             logger.error("Error storing auth token", error=str(e))
-            self.db.rollback()
             raise
 
 # Create singleton instance
@@ -63,6 +63,12 @@ class Settings(BaseSettings):
     DATABASE_PASSWORD: str = ""
     TABLE_PREFIX: str = "ost_"
     
+    # Connection pool (applies to both sync and async engines)
+    DB_POOL_SIZE: int = 25
+    DB_MAX_OVERFLOW: int = 25
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 3600  # Seconds, well under MySQL's default wait_timeout
+    
     # Security
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
@@ -77,6 +83,7 @@ class Settings(BaseSettings):
     # Application
     DEBUG: bool = False
     LOG_LEVEL: str = "INFO"
+    STRICT_ORM_LOADING: bool = False  # Raise on unplanned lazy loads (dev/test)
     
     # OAuth2/OIDC Identity Providers
     # Keycloak Configuration
@@ -156,6 +163,11 @@ class Settings(BaseSettings):
             f"?charset=utf8mb4"
         )
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """Construct async (aiomysql) database URL for SQLAlchemy"""
+        return self.DATABASE_URL.replace("mysql+pymysql://", "mysql+aiomysql://", 1)
+
 # Global settings instance
 settings = Settings()
 
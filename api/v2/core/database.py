@@ -4,12 +4,14 @@ Database connection and session management for OSTicket API v2
 Integrates with OSTicket's existing database using SQLAlchemy ORM.
 """
 
-from sqlalchemy import create_engine, MetaData, text
+from sqlalchemy import create_engine, event, MetaData, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 import structlog
-from typing import AsyncGenerator
+from contextlib import contextmanager
+from typing import AsyncGenerator, Iterator, List
 from .config import settings
 
 logger = structlog.get_logger()
@@ -18,8 +20,13 @@ logger = structlog.get_logger()
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_recycle=300,  # Recycle connections after 5 minutes
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=True,  # Replace connections the server dropped before handing them out
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    query_cache_size=1200,  # Compiled statement cache shared by all sessions
+    insertmanyvalues_page_size=1000,  # Rows per multi-VALUES batch for bulk INSERT
     connect_args={
         "charset": "utf8mb4",
         "connect_timeout": 10,
@@ -31,6 +38,25 @@ engine = create_engine(
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers that must not block the event loop
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    echo=settings.DEBUG,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=True,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    query_cache_size=1200,
+    connect_args={
+        "charset": "utf8mb4",
+        "connect_timeout": 10,
+    }
+)
+
+# Async session factory
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for ORM models
 Base = declarative_base()
 
@@ -47,6 +73,13 @@ def get_table_name(name: str) -> str:
     """Add OSTicket table prefix to table name"""
     return f"{settings.TABLE_PREFIX}{name}"
 
+def check_statement_cache() -> None:
+    """Warn if a dialect opts out of SQLAlchemy's compiled statement cache"""
+    for name, dialect in (("sync", engine.dialect), ("async", async_engine.dialect)):
+        if not dialect.supports_statement_cache:
+            logger.warning("Statement cache disabled by dialect; every query will be recompiled",
+                           engine=name, dialect=f"{dialect.name}+{dialect.driver}")
+
 async def test_connection() -> bool:
     """Test database connection"""
     try:
@@ -79,6 +112,25 @@ async def get_db_async() -> AsyncGenerator[Session, None]:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get async database session - for FastAPI dependency injection"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+@contextmanager
+def count_queries(bind=engine) -> Iterator[List[str]]:
+    """Record the SQL statements executed on bind inside the block"""
+    statements: List[str] = []
+    
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(bind, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", _record)
+
 def check_osticket_tables() -> dict:
     """Check if OSTicket tables exist in the database"""
     required_tables = [
@@ -4,9 +4,13 @@ IdP provides identity verification only - roles managed internally
 """
 
 import json
+import hmac
+import hashlib
 import secrets
+import struct
 import base64
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, Optional, Tuple
 from urllib.parse import urlencode
 import httpx
 from fastapi import HTTPException
@@ -16,6 +20,19 @@ import structlog
 
 logger = structlog.get_logger()
 
+_STATE_HEADER = struct.Struct(">QI")  # issued-at seconds, return URL length
+_STATE_NONCE_BYTES = 16
+_STATE_SIG_BYTES = hashlib.sha256().digest_size
+
+# The state nonce is also set in this cookie at login so the callback only
+# accepts a state issued to the same browser, within STATE_MAX_AGE seconds
+STATE_COOKIE = "osticket_oauth2_state"
+STATE_MAX_AGE = 600
+
+def _state_key() -> bytes:
+    """Key for signing OAuth2 state parameters"""
+    return (settings.JWT_SECRET_KEY or settings.SECRET_KEY).encode()
+
 class OAuth2Provider:
     """Base OAuth2/OIDC provider"""
     
@@ -35,9 +52,43 @@ class OAuth2Provider:
         """Get user information from provider"""
         raise NotImplementedError
     
-    def generate_state(self) -> str:
-        """Generate secure state parameter"""
-        return base64.urlsafe_b64encode(secrets.token_bytes(32)).decode('utf-8')
+    def generate_state(self, return_url: Optional[str] = None) -> Tuple[str, str]:
+        """Generate signed state parameter carrying an optional return URL
+        
+        Layout before base64url: 8-byte issued-at timestamp and 4-byte URL
+        length (big-endian), URL bytes, 16-byte nonce, then an HMAC-SHA256
+        over all of it. Returns the state and the hex nonce for STATE_COOKIE.
+        """
+        url = (return_url or "").encode()
+        nonce = secrets.token_bytes(_STATE_NONCE_BYTES)
+        payload = _STATE_HEADER.pack(int(time.time()), len(url)) + url + nonce
+        signature = hmac.new(_state_key(), payload, hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(payload + signature).decode().rstrip("="), nonce.hex()
+    
+    def parse_state(self, state: str, nonce: Optional[str]) -> Optional[str]:
+        """Verify a state from generate_state against the STATE_COOKIE nonce
+        
+        Returns the return URL (None if absent); raises ValueError if the
+        state is forged, expired or was issued to another browser.
+        """
+        try:
+            raw = memoryview(base64.urlsafe_b64decode(state + "=" * (-len(state) % 4)))
+        except (ValueError, TypeError):
+            raise ValueError("Malformed OAuth2 state")
+        
+        payload, signature = raw[:-_STATE_SIG_BYTES], raw[-_STATE_SIG_BYTES:]
+        expected = hmac.new(_state_key(), payload, hashlib.sha256).digest()
+        if len(payload) < _STATE_HEADER.size + _STATE_NONCE_BYTES or not hmac.compare_digest(expected, signature):
+            raise ValueError("Invalid OAuth2 state signature")
+        
+        issued_at, url_length = _STATE_HEADER.unpack_from(payload)
+        if url_length != len(payload) - _STATE_HEADER.size - _STATE_NONCE_BYTES:
+            raise ValueError("Malformed OAuth2 state")
+        if time.time() - issued_at > STATE_MAX_AGE:
+            raise ValueError("Expired OAuth2 state")
+        if not hmac.compare_digest(bytes(payload[-_STATE_NONCE_BYTES:]).hex().encode(), (nonce or "").encode()):
+            raise ValueError("OAuth2 state not issued to this client")
+        return bytes(payload[_STATE_HEADER.size:_STATE_HEADER.size + url_length]).decode() or None
 
 class KeycloakProvider(OAuth2Provider):
     """Keycloak OAuth2/OIDC provider"""
@@ -63,7 +114,7 @@ class KeycloakProvider(OAuth2Provider):
     async def get_authorization_url(self, redirect_uri: str, state: str = None) -> str:
         """Get Keycloak authorization URL"""
         if not state:
-            state = self.generate_state()
+            state, _ = self.generate_state()
         
         params = {
             'client_id': self.client_id,
@@ -162,7 +213,7 @@ class MicrosoftProvider(OAuth2Provider):
     async def get_authorization_url(self, redirect_uri: str, state: str = None) -> str:
         """Get Microsoft authorization URL"""
         if not state:
-            state = self.generate_state()
+            state, _ = self.generate_state()
         
         params = {
             'client_id': self.client_id,
@@ -0,0 +1,84 @@
+"""
+Request-scoped batch loaders for OSTicket API v2
+
+Coalesces the per-object lookups made while serializing a response into a
+single IN (...) query per model, e.g. `await loaders.user.load(ticket.user_id)`.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+from aiodataloader import DataLoader
+from fastapi import Depends, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .cache import STATUS_BY_ID
+from .core.database import get_async_db
+from .models import Staff, Ticket, User
+
+class ModelLoader(DataLoader):
+    """Load instances of model by primary key, one query per batch"""
+
+    model: Any = None
+    key: str = "id"
+
+    def __init__(self, session: AsyncSession, lock: asyncio.Lock):
+        super().__init__()
+        self.session = session
+        # Loaders share the request's session, which allows one query at a time
+        self.lock = lock
+
+    async def batch_load_fn(self, ids: List[int]) -> List[Optional[Any]]:
+        column = getattr(self.model, self.key)
+        async with self.lock:
+            rows = await self.session.scalars(select(self.model).where(column.in_(ids)))
+        by_id = {getattr(row, self.key): row for row in rows}
+        # DataLoader requires results in the same order as the requested keys
+        return [by_id.get(i) for i in ids]
+
+class UserLoader(ModelLoader):
+    """Batch loader for users"""
+    model = User
+
+class StaffLoader(ModelLoader):
+    """Batch loader for staff members"""
+    model = Staff
+    key = "staff_id"
+
+class StatusLoader(DataLoader):
+    """Batch loader for ticket statuses, served from the startup lookup cache"""
+
+    async def batch_load_fn(self, ids: List[int]) -> List[Optional[Any]]:
+        return [STATUS_BY_ID.get(i) for i in ids]
+
+@dataclass
+class Loaders:
+    """Loaders shared by everything serialized within one request"""
+    user: UserLoader
+    staff: StaffLoader
+    status: StatusLoader
+
+async def get_loaders(request: Request, db: AsyncSession = Depends(get_async_db)) -> Loaders:
+    """Get the request's batch loaders - for FastAPI dependency injection"""
+    loaders = getattr(request.state, "loaders", None)
+    if loaders is None:
+        lock = asyncio.Lock()
+        loaders = Loaders(user=UserLoader(db, lock), staff=StaffLoader(db, lock), status=StatusLoader())
+        request.state.loaders = loaders
+    return loaders
+
+async def load_ticket_refs(tickets: Sequence[Ticket], loaders: Loaders) -> List[Dict[str, Any]]:
+    """Resolve the user, staff and status of each ticket through the request loaders
+
+    All loads are issued in one tick, so a page of tickets costs one query
+    per model rather than one per ticket.
+    """
+    async def refs(ticket: Ticket) -> Dict[str, Any]:
+        user, staff, status = await asyncio.gather(
+            loaders.user.load(ticket.user_id),
+            loaders.staff.load(ticket.staff_id),
+            loaders.status.load(ticket.status_id),
+        )
+        return {"user": user, "staff": staff, "status": status}
+
+    return list(await asyncio.gather(*(refs(ticket) for ticket in tickets)))
@@ -7,7 +7,7 @@ integrating with the existing PHP codebase and database.
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 import structlog
 import os
 import sys
@@ -48,7 +48,8 @@ def create_app() -> FastAPI:
         version="2.0.0",
         openapi_url="/api/v2/openapi.json",
         docs_url="/api/v2/docs",
-        redoc_url="/api/v2/redoc"
+        redoc_url="/api/v2/redoc",
+        default_response_class=ORJSONResponse
     )
     
     # CORS configuration
@@ -79,9 +80,18 @@ def create_app() -> FastAPI:
         
         # Test database connection
         try:
-            from .core.database import test_connection
+            from .core.database import test_connection, check_statement_cache, SessionLocal
             await test_connection()
+            check_statement_cache()
             logger.info("Database connection established successfully")
+            
+            # Cache the ticket status lookup table
+            from .cache import load_lookup_tables
+            with SessionLocal() as db:
+                load_lookup_tables(db)
+            
+            # Serve health probes from a periodically refreshed snapshot
+            health.start_health_refresh()
         except Exception as e:
             logger.error("Database connection failed", error=str(e))
             raise
@@ -90,6 +100,7 @@ def create_app() -> FastAPI:
     async def shutdown_event():
         """Cleanup on application shutdown"""
         logger.info("Shutting down OSTicket API v2")
+        await health.stop_health_refresh()
     
     return app
 
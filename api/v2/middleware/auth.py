@@ -4,6 +4,7 @@ Multi-provider authentication: API keys, OAuth2/OIDC, staff/user passwords, JWT
 """
 
 import re
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Callable, Optional, Tuple
 from fastapi import Request, Response, HTTPException, status
@@ -22,25 +23,24 @@ from ..core.exceptions import AuthenticationError, AuthorizationError
 
 logger = structlog.get_logger()
 
+@dataclass(slots=True, frozen=True)
 class AuthContext:
     """Authentication context for the current request"""
     
-    def __init__(
-        self,
-        auth_type: str,
-        api_key: Optional[ApiKey] = None,
-        staff: Optional[Staff] = None,
-        user: Optional[User] = None,
-        session_id: Optional[str] = None
-    ):
-        self.auth_type = auth_type  # "api_key", "staff_session", "user_session", "anonymous"
-        self.api_key = api_key
-        self.staff = staff
-        self.user = user
-        self.session_id = session_id
-        self.is_authenticated = auth_type != "anonymous"
-        self.is_staff = staff is not None
-        self.is_admin = staff and staff.isadmin if staff else False
+    auth_type: str  # "api_key", "staff_session", "user_session", "anonymous"
+    api_key: Optional[ApiKey] = None
+    staff: Optional[Staff] = None
+    user: Optional[User] = None
+    session_id: Optional[str] = None
+    is_authenticated: bool = field(init=False)
+    is_staff: bool = field(init=False)
+    is_admin: bool = field(init=False)
+    
+    def __post_init__(self):
+        # Derived flags are computed once; frozen instances need object.__setattr__
+        object.__setattr__(self, "is_authenticated", self.auth_type != "anonymous")
+        object.__setattr__(self, "is_staff", self.staff is not None)
+        object.__setattr__(self, "is_admin", bool(self.staff.isadmin) if self.staff else False)
 
 class AuthMiddleware(BaseHTTPMiddleware):
     """Authentication middleware"""
@@ -170,12 +170,9 @@ class AuthMiddleware(BaseHTTPMiddleware):
             
             # Verify user still exists and is active
             if user_type == "staff":
-                staff = db.query(Staff).filter(
-                    Staff.staff_id == user_id,
-                    Staff.isactive == True
-                ).first()
+                staff = Staff.get_by_id(db, user_id)
                 
-                if not staff:
+                if not staff or not staff.isactive:
                     logger.warning(
                         "JWT token references non-existent or inactive staff",
                         staff_id=user_id,
@@ -244,12 +241,9 @@ class AuthMiddleware(BaseHTTPMiddleware):
         if session and session.user_id and session.user_id != "0":
             try:
                 # Try to match as staff first (user_id could be staff_id)
-                staff = db.query(Staff).filter(
-                    Staff.staff_id == int(session.user_id),
-                    Staff.isactive == True
-                ).first()
+                staff = Staff.get_by_id(db, int(session.user_id))
                 
-                if staff:
+                if staff and staff.isactive:
                     logger.info(
                         "Staff session authentication successful",
                         staff_id=staff.staff_id,
@@ -1,5 +1,6 @@
 # Database models - Complete OSTicket Schema
-from .base import OSTicketBase, TimestampMixin
+from .base import OSTicketBase, TimestampMixin, ReprMixin
+from .types import OrjsonType, InetType
 from .auth import ExternalIdentity, AuthToken
 
 # Core system models
@@ -21,7 +22,8 @@ from .user import (
 
 # Ticket system models
 from .ticket import (
-    Ticket, TicketCData, TicketStatus, TicketPriority, Thread, ThreadEntry,
+    Ticket, TicketSource, TicketCData, TicketStatus, TicketPriority, Thread, ThreadEntry,
+    MessageThreadEntry, ResponseThreadEntry, NoteThreadEntry, BounceThreadEntry,
     ThreadEntryEmail, ThreadEntryMerge, ThreadEvent, ThreadReferral,
     ThreadCollaborator, Note
 )
@@ -38,13 +40,13 @@ from .form import (
 
 # Knowledge base models
 from .knowledge import (
-    FAQ, FAQCategory, FAQTopic, HelpTopic, HelpTopicForm
+    FAQ, FAQCategory, faq_topic, HelpTopic, HelpTopicForm
 )
 
 # Additional system models
 from .system import (
     Queue, QueueColumn, QueueColumns, QueueConfig, QueueExport, QueueSort,
-    QueueSorts, Filter, FilterRule, FilterAction, Plugin, PluginInstance,
+    QueueSorts, Filter, FilterRule, FilterRuleHow, FilterAction, Plugin, PluginInstance,
     Task, TaskCData, List, ListItems
 )
 
@@ -52,6 +54,9 @@ __all__ = [
     # Base classes
     "OSTicketBase",
     "TimestampMixin",
+    "ReprMixin",
+    "OrjsonType",
+    "InetType",
     
     # Auth models
     "ExternalIdentity",
@@ -69,7 +74,8 @@ __all__ = [
     "User", "UserCData", "UserEmail", "UserAccount", "Organization", "OrganizationCData",
     
     # Ticket system models
-    "Ticket", "TicketCData", "TicketStatus", "TicketPriority", "Thread", "ThreadEntry",
+    "Ticket", "TicketSource", "TicketCData", "TicketStatus", "TicketPriority", "Thread", "ThreadEntry",
+    "MessageThreadEntry", "ResponseThreadEntry", "NoteThreadEntry", "BounceThreadEntry",
     "ThreadEntryEmail", "ThreadEntryMerge", "ThreadEvent", "ThreadReferral",
     "ThreadCollaborator", "Note",
     
@@ -80,10 +86,10 @@ __all__ = [
     "Form", "FormField", "FormEntry", "FormEntryValues",
     
     # Knowledge base models
-    "FAQ", "FAQCategory", "FAQTopic", "HelpTopic", "HelpTopicForm",
+    "FAQ", "FAQCategory", "faq_topic", "HelpTopic", "HelpTopicForm",
     
     # Additional system models
     "Queue", "QueueColumn", "QueueColumns", "QueueConfig", "QueueExport", "QueueSort",
-    "QueueSorts", "Filter", "FilterRule", "FilterAction", "Plugin", "PluginInstance",
+    "QueueSorts", "Filter", "FilterRule", "FilterRuleHow", "FilterAction", "Plugin", "PluginInstance",
     "Task", "TaskCData", "List", "ListItems",
 ]
\ No newline at end of file
@@ -3,14 +3,19 @@ Authentication related database models for OSTicket API v2
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import relationship, Session
 from .base import OSTicketBase, TimestampMixin
+from .types import InetType
 
 class ExternalIdentity(OSTicketBase, TimestampMixin):
     """External identity provider mappings - IdP verifies identity, roles stay internal"""
     
     __tablename__ = "ost_external_identity"
+    __table_args__ = (
+        UniqueConstraint("provider", "external_user_id", name="uq_external_identity_provider_user"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     provider = Column(String(50), nullable=False, index=True)  # 'keycloak', 'microsoft', etc.
@@ -45,11 +50,29 @@ class AuthToken(OSTicketBase, TimestampMixin):
     expires_at = Column(DateTime, nullable=False, index=True)
     
     # Session information
-    ip_address = Column(String(64), nullable=True)
+    ip_address = Column(InetType, nullable=True)
     user_agent = Column(String(500), nullable=True)
     
     # Flags
     is_revoked = Column(Boolean, nullable=False, default=False, index=True)
     
     def __repr__(self):
-        return f"<AuthToken(id={self.id}, user_type='{self.user_type}', user_id={self.user_id}, token_type='{self.token_type}')>"
\ No newline at end of file
+        return f"<AuthToken(id={self.id}, user_type='{self.user_type}', user_id={self.user_id}, token_type='{self.token_type}')>"
+
+# Rows per INSERT ... ON DUPLICATE KEY UPDATE statement during IdP sync
+_UPSERT_BATCH_SIZE = 50
+
+def bulk_upsert_external_identities(session: Session, rows: list[dict]) -> None:
+    """Insert or update external identities keyed on (provider, external_user_id) in batches"""
+    for start in range(0, len(rows), _UPSERT_BATCH_SIZE):
+        stmt = mysql_insert(ExternalIdentity.__table__).values(rows[start:start + _UPSERT_BATCH_SIZE])
+        stmt = stmt.on_duplicate_key_update(
+            osticket_user_type=stmt.inserted.osticket_user_type,
+            osticket_user_id=stmt.inserted.osticket_user_id,
+            external_username=stmt.inserted.external_username,
+            external_email=stmt.inserted.external_email,
+            external_name=stmt.inserted.external_name,
+            is_active=stmt.inserted.is_active,
+            updated=stmt.inserted.updated,
+        )
+        session.execute(stmt)
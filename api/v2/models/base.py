@@ -4,8 +4,9 @@ Base model classes for OSTicket API v2
 Provides common functionality and patterns for all database models.
 """
 
-from sqlalchemy import Column, Integer, DateTime, func
+from sqlalchemy import Column, Integer, String, DateTime, func, inspect, text
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
+from sqlalchemy.orm import MappedColumn, mapped_column
 from ..core.database import get_table_name
 
 @as_declarative()
@@ -17,11 +18,43 @@ class Base:
     def __tablename__(cls):
         return get_table_name(cls.__name__.lower())
 
+def int_column(default: int = 0) -> MappedColumn:
+    """NOT NULL integer column, the shape of most osTicket id/flag columns"""
+    return mapped_column(Integer, nullable=False, server_default=text(str(default)))
+
+def str_column(length: int, default: str = "") -> MappedColumn:
+    """NOT NULL VARCHAR column defaulting to an empty string"""
+    return mapped_column(String(length), nullable=False, server_default=text(f"'{default}'"))
+
 class TimestampMixin:
-    """Mixin to add created/updated timestamps"""
+    """Mixin to add created/updated timestamps maintained by the database"""
+    
+    # The SQL-expression default/onupdate cover stock osTicket tables whose
+    # columns have no DEFAULT; the database clock supplies the value either way
+    @declared_attr
+    def created(cls):
+        return Column(
+            DateTime,
+            nullable=False,
+            default=func.current_timestamp(),
+            server_default=func.current_timestamp(),
+        )
+    
+    @declared_attr
+    def updated(cls):
+        return Column(
+            DateTime,
+            nullable=False,
+            default=func.current_timestamp(),
+            onupdate=func.current_timestamp(),
+            server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        )
+
+class ReprMixin:
+    """Mixin for a primary-key repr that never loads attributes"""
     
-    created = Column(DateTime, nullable=False, server_default=func.now())
-    updated = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+    def __repr__(self):
+        return f"<{type(self).__name__}{inspect(self).identity or ()}>"
 
 class OSTicketBase(Base):
     """Base class for OSTicket models with proper table naming"""
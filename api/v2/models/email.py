@@ -2,8 +2,10 @@
 Email system models for OSTicket API v2
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Enum
-from sqlalchemy.orm import relationship
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, Text, Enum, bindparam, select, text
+from sqlalchemy.orm import Mapped, mapped_column, Session
 from .base import OSTicketBase
 
 class Email(OSTicketBase):
@@ -11,16 +13,16 @@ class Email(OSTicketBase):
     
     __tablename__ = "ost_email"
     
-    email_id = Column(Integer, primary_key=True, autoincrement=True)
-    noautoresp = Column(Boolean, nullable=False, default=False)
-    priority_id = Column(Integer, nullable=False, default=2)
-    dept_id = Column(Integer, nullable=False, default=0)
-    topic_id = Column(Integer, nullable=False, default=0)
-    email = Column(String(255), nullable=False, default="", unique=True)
-    name = Column(String(255), nullable=False, default="")
-    notes = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    email_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    noautoresp: Mapped[bool] = mapped_column(server_default=text("0"))
+    priority_id: Mapped[int] = mapped_column(server_default=text("2"))
+    dept_id: Mapped[int] = mapped_column(server_default=text("0"))
+    topic_id: Mapped[int] = mapped_column(server_default=text("0"))
+    email: Mapped[str] = mapped_column(String(255), server_default=text("''"), unique=True)
+    name: Mapped[str] = mapped_column(String(255), server_default=text("''"))
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+    created: Mapped[datetime] = mapped_column()
+    updated: Mapped[datetime] = mapped_column()
     
     def __repr__(self):
         return f"<Email(email_id={self.email_id}, email='{self.email}', name='{self.name}')>"
@@ -30,28 +32,28 @@ class EmailAccount(OSTicketBase):
     
     __tablename__ = "ost_email_account"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    email_id = Column(Integer, nullable=False)
-    type = Column(Enum('mailbox', 'smtp', name='email_account_type'), nullable=False, default='mailbox')
-    auth_bk = Column(String(128), nullable=False)
-    auth_id = Column(String(16), nullable=True)
-    active = Column(Boolean, nullable=False, default=False)
-    host = Column(String(128), nullable=False, default="")
-    port = Column(Integer, nullable=False)
-    folder = Column(String(255), nullable=True)
-    protocol = Column(Enum('IMAP', 'POP', 'SMTP', 'OTHER', name='email_protocol'), nullable=False, default='OTHER')
-    encryption = Column(Enum('NONE', 'AUTO', 'SSL', name='email_encryption'), nullable=False, default='AUTO')
-    fetchfreq = Column(Integer, nullable=False, default=5)
-    fetchmax = Column(Integer, nullable=True, default=30)
-    postfetch = Column(Enum('archive', 'delete', 'nothing', name='email_postfetch'), nullable=False, default='nothing')
-    archivefolder = Column(String(255), nullable=True)
-    allow_spoofing = Column(Boolean, nullable=True, default=False)
-    num_errors = Column(Integer, nullable=False, default=0)
-    last_error_msg = Column(Text, nullable=True)
-    last_error = Column(DateTime, nullable=True)
-    last_activity = Column(DateTime, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False, default='0000-00-00 00:00:00')
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    email_id: Mapped[int] = mapped_column()
+    type: Mapped[str] = mapped_column(Enum('mailbox', 'smtp', name='email_account_type'), server_default=text("'mailbox'"))
+    auth_bk: Mapped[str] = mapped_column(String(128))
+    auth_id: Mapped[Optional[str]] = mapped_column(String(16))
+    active: Mapped[bool] = mapped_column(server_default=text("0"))
+    host: Mapped[str] = mapped_column(String(128), server_default=text("''"))
+    port: Mapped[int] = mapped_column()
+    folder: Mapped[Optional[str]] = mapped_column(String(255))
+    protocol: Mapped[str] = mapped_column(Enum('IMAP', 'POP', 'SMTP', 'OTHER', name='email_protocol'), server_default=text("'OTHER'"))
+    encryption: Mapped[str] = mapped_column(Enum('NONE', 'AUTO', 'SSL', name='email_encryption'), server_default=text("'AUTO'"))
+    fetchfreq: Mapped[int] = mapped_column(server_default=text("5"))
+    fetchmax: Mapped[Optional[int]] = mapped_column(server_default=text("30"))
+    postfetch: Mapped[str] = mapped_column(Enum('archive', 'delete', 'nothing', name='email_postfetch'), server_default=text("'nothing'"))
+    archivefolder: Mapped[Optional[str]] = mapped_column(String(255))
+    allow_spoofing: Mapped[Optional[bool]] = mapped_column(server_default=text("0"))
+    num_errors: Mapped[int] = mapped_column(server_default=text("0"))
+    last_error_msg: Mapped[Optional[str]] = mapped_column(Text)
+    last_error: Mapped[Optional[datetime]] = mapped_column()
+    last_activity: Mapped[Optional[datetime]] = mapped_column()
+    created: Mapped[datetime] = mapped_column()
+    updated: Mapped[datetime] = mapped_column(server_default=text("'0000-00-00 00:00:00'"))
     
     def __repr__(self):
         return f"<EmailAccount(id={self.id}, email_id={self.email_id}, type='{self.type}')>"
@@ -61,14 +63,19 @@ class EmailTemplate(OSTicketBase):
     
     __tablename__ = "ost_email_template"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    tpl_id = Column(Integer, nullable=False, default=0)
-    code_name = Column(String(32), nullable=False)
-    subject = Column(String(255), nullable=False)
-    body = Column(Text, nullable=False)
-    notes = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    tpl_id: Mapped[int] = mapped_column(server_default=text("0"))
+    code_name: Mapped[str] = mapped_column(String(32))
+    subject: Mapped[str] = mapped_column(String(255))
+    body: Mapped[str] = mapped_column(Text)
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+    created: Mapped[datetime] = mapped_column()
+    updated: Mapped[datetime] = mapped_column()
+    
+    @classmethod
+    def get_by_code(cls, session: Session, tpl_id: int, code_name: str) -> Optional["EmailTemplate"]:
+        """Fetch template of a template group by code name"""
+        return session.scalar(_get_email_template_by_code, {"tpl_id": tpl_id, "code_name": code_name})
     
     def __repr__(self):
         return f"<EmailTemplate(id={self.id}, code_name='{self.code_name}', subject='{self.subject}')>"
@@ -78,13 +85,13 @@ class EmailTemplateGroup(OSTicketBase):
     
     __tablename__ = "ost_email_template_group"
     
-    tpl_id = Column(Integer, primary_key=True, autoincrement=True)
-    isactive = Column(Boolean, nullable=False, default=False)
-    name = Column(String(32), nullable=False, default="")
-    lang = Column(String(16), nullable=False, default="en_US")
-    notes = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    tpl_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    isactive: Mapped[bool] = mapped_column(server_default=text("0"))
+    name: Mapped[str] = mapped_column(String(32), server_default=text("''"))
+    lang: Mapped[str] = mapped_column(String(16), server_default=text("'en_US'"))
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+    created: Mapped[datetime] = mapped_column()
+    updated: Mapped[datetime] = mapped_column()
     
     def __repr__(self):
         return f"<EmailTemplateGroup(tpl_id={self.tpl_id}, name='{self.name}', lang='{self.lang}')>"
@@ -94,15 +101,21 @@ class CannedResponse(OSTicketBase):
     
     __tablename__ = "ost_canned_response"
     
-    canned_id = Column(Integer, primary_key=True, autoincrement=True)
-    dept_id = Column(Integer, nullable=False, default=0)
-    isenabled = Column(Boolean, nullable=False, default=True)
-    title = Column(String(255), nullable=False, default="", unique=True)
-    response = Column(Text, nullable=False)
-    lang = Column(String(16), nullable=False, default="en_US")
-    notes = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    canned_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    dept_id: Mapped[int] = mapped_column(server_default=text("0"))
+    isenabled: Mapped[bool] = mapped_column(server_default=text("1"))
+    title: Mapped[str] = mapped_column(String(255), server_default=text("''"), unique=True)
+    response: Mapped[str] = mapped_column(Text)
+    lang: Mapped[str] = mapped_column(String(16), server_default=text("'en_US'"))
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+    created: Mapped[datetime] = mapped_column()
+    updated: Mapped[datetime] = mapped_column()
     
     def __repr__(self):
-        return f"<CannedResponse(canned_id={self.canned_id}, title='{self.title}')>"
\ No newline at end of file
+        return f"<CannedResponse(canned_id={self.canned_id}, title='{self.title}')>"
+
+# Prebuilt statements for hot single-row lookups, reused from the compiled cache
+_get_email_template_by_code = select(EmailTemplate).where(
+    EmailTemplate.tpl_id == bindparam("tpl_id"),
+    EmailTemplate.code_name == bindparam("code_name"),
+)
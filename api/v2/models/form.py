@@ -2,8 +2,11 @@
 Forms system models for OSTicket API v2
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Enum
-from sqlalchemy.orm import relationship
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, Text, UniqueConstraint, func, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Mapped, mapped_column, Session
 from .base import OSTicketBase
 
 class Form(OSTicketBase):
@@ -11,15 +14,15 @@ class Form(OSTicketBase):
     
     __tablename__ = "ost_form"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    pid = Column(Integer, nullable=True)
-    type = Column(String(8), nullable=False, default="G")
-    flags = Column(Integer, nullable=False, default=1)
-    title = Column(String(255), nullable=False, default="")
-    instructions = Column(String(512), nullable=False, default="")
-    notes = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    pid: Mapped[Optional[int]] = mapped_column()
+    type: Mapped[str] = mapped_column(String(8), server_default=text("'G'"))
+    flags: Mapped[int] = mapped_column(server_default=text("1"))
+    title: Mapped[str] = mapped_column(String(255), server_default=text("''"))
+    instructions: Mapped[str] = mapped_column(String(512), server_default=text("''"))
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+    created: Mapped[datetime] = mapped_column()
+    updated: Mapped[datetime] = mapped_column()
     
     def __repr__(self):
         return f"<Form(id={self.id}, title='{self.title}', type='{self.type}')>"
@@ -28,18 +31,21 @@ class FormField(OSTicketBase):
     """Form field model"""
     
     __tablename__ = "ost_form_field"
+    __table_args__ = (
+        UniqueConstraint('form_id', 'name', name='uq_form_field_form_name'),
+    )
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    form_id = Column(Integer, nullable=False, default=0)
-    flags = Column(Integer, nullable=False, default=1)
-    type = Column(String(255), nullable=False, default="text")
-    label = Column(String(255), nullable=False, default="")
-    name = Column(String(64), nullable=False, default="")
-    configuration = Column(Text, nullable=True)
-    sort = Column(Integer, nullable=False, default=1)
-    hint = Column(String(512), nullable=False, default="")
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    form_id: Mapped[int] = mapped_column(server_default=text("0"))
+    flags: Mapped[int] = mapped_column(server_default=text("1"))
+    type: Mapped[str] = mapped_column(String(255), server_default=text("'text'"))
+    label: Mapped[str] = mapped_column(String(255), server_default=text("''"))
+    name: Mapped[str] = mapped_column(String(64), server_default=text("''"))
+    configuration: Mapped[Optional[str]] = mapped_column(Text)
+    sort: Mapped[int] = mapped_column(server_default=text("1"))
+    hint: Mapped[str] = mapped_column(String(512), server_default=text("''"))
+    created: Mapped[datetime] = mapped_column()
+    updated: Mapped[datetime] = mapped_column()
     
     def __repr__(self):
         return f"<FormField(id={self.id}, form_id={self.form_id}, label='{self.label}', type='{self.type}')>"
@@ -49,14 +55,14 @@ class FormEntry(OSTicketBase):
     
     __tablename__ = "ost_form_entry"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    form_id = Column(Integer, nullable=False, default=0)
-    object_id = Column(Integer, nullable=False, default=0)
-    object_type = Column(String(1), nullable=False, default="T")
-    sort = Column(Integer, nullable=False, default=1)
-    extra = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    form_id: Mapped[int] = mapped_column(server_default=text("0"))
+    object_id: Mapped[int] = mapped_column(server_default=text("0"))
+    object_type: Mapped[str] = mapped_column(String(1), server_default=text("'T'"))
+    sort: Mapped[int] = mapped_column(server_default=text("1"))
+    extra: Mapped[Optional[str]] = mapped_column(Text)
+    created: Mapped[datetime] = mapped_column()
+    updated: Mapped[datetime] = mapped_column()
     
     def __repr__(self):
         return f"<FormEntry(id={self.id}, form_id={self.form_id}, object_id={self.object_id})>"
@@ -66,10 +72,27 @@ class FormEntryValues(OSTicketBase):
     
     __tablename__ = "ost_form_entry_values"
     
-    entry_id = Column(Integer, primary_key=True)
-    field_id = Column(Integer, primary_key=True)
-    value = Column(Text, nullable=True)
-    value_id = Column(Integer, nullable=True)
+    entry_id: Mapped[int] = mapped_column(primary_key=True)
+    field_id: Mapped[int] = mapped_column(primary_key=True)
+    value: Mapped[Optional[str]] = mapped_column(Text)
+    value_id: Mapped[Optional[int]] = mapped_column()
     
     def __repr__(self):
-        return f"<FormEntryValues(entry_id={self.entry_id}, field_id={self.field_id})>"
\ No newline at end of file
+        return f"<FormEntryValues(entry_id={self.entry_id}, field_id={self.field_id})>"
+
+def upsert_form_fields(session: Session, rows: list[dict]) -> None:
+    """Insert or update form fields keyed on (form_id, name) in a single statement"""
+    if not rows:
+        return
+    
+    stmt = mysql_insert(FormField).values(rows)
+    stmt = stmt.on_duplicate_key_update(
+        flags=stmt.inserted.flags,
+        type=stmt.inserted.type,
+        label=stmt.inserted.label,
+        hint=stmt.inserted.hint,
+        configuration=stmt.inserted.configuration,
+        sort=stmt.inserted.sort,
+        updated=func.now(),
+    )
+    session.execute(stmt)
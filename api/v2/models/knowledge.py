@@ -2,24 +2,37 @@
 Knowledge base models for OSTicket API v2
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Enum
-from sqlalchemy.orm import relationship
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Table, bindparam, select, text
+from sqlalchemy.orm import Mapped, mapped_column, relationship, Session
 from .base import OSTicketBase
 
+# Pure FAQ <-> help topic association, no columns beyond the key pair
+faq_topic = Table(
+    "ost_faq_topic",
+    OSTicketBase.metadata,
+    Column("faq_id", Integer, ForeignKey("ost_faq.faq_id"), primary_key=True),
+    Column("topic_id", Integer, ForeignKey("ost_help_topic.topic_id"), primary_key=True),
+)
+
 class FAQ(OSTicketBase):
     """FAQ model"""
     
     __tablename__ = "ost_faq"
     
-    faq_id = Column(Integer, primary_key=True, autoincrement=True)
-    category_id = Column(Integer, nullable=False, default=0)
-    ispublished = Column(Boolean, nullable=False, default=False)
-    question = Column(String(255), nullable=False)
-    answer = Column(Text, nullable=False)
-    keywords = Column(Text, nullable=True)
-    notes = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    faq_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    category_id: Mapped[int] = mapped_column(server_default=text("0"))
+    ispublished: Mapped[bool] = mapped_column(server_default=text("0"))
+    question: Mapped[str] = mapped_column(String(255))
+    answer: Mapped[str] = mapped_column(Text)
+    keywords: Mapped[Optional[str]] = mapped_column(Text)
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+    created: Mapped[datetime] = mapped_column()
+    updated: Mapped[datetime] = mapped_column()
+    
+    # Relationships
+    topics: Mapped[List["HelpTopic"]] = relationship(secondary=faq_topic)
     
     def __repr__(self):
         return f"<FAQ(faq_id={self.faq_id}, question='{self.question}')>"
@@ -29,53 +42,47 @@ class FAQCategory(OSTicketBase):
     
     __tablename__ = "ost_faq_category"
     
-    category_id = Column(Integer, primary_key=True, autoincrement=True)
-    ispublic = Column(Boolean, nullable=False, default=False)
-    name = Column(String(125), nullable=False, default="", unique=True)
-    description = Column(Text, nullable=False)
-    notes = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    category_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    ispublic: Mapped[bool] = mapped_column(server_default=text("0"))
+    name: Mapped[str] = mapped_column(String(125), server_default=text("''"), unique=True)
+    description: Mapped[str] = mapped_column(Text)
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+    created: Mapped[datetime] = mapped_column()
+    updated: Mapped[datetime] = mapped_column()
     
     def __repr__(self):
         return f"<FAQCategory(category_id={self.category_id}, name='{self.name}')>"
 
-class FAQTopic(OSTicketBase):
-    """FAQ topic model"""
-    
-    __tablename__ = "ost_faq_topic"
-    
-    faq_id = Column(Integer, primary_key=True)
-    topic_id = Column(Integer, primary_key=True)
-    
-    def __repr__(self):
-        return f"<FAQTopic(faq_id={self.faq_id}, topic_id={self.topic_id})>"
-
 class HelpTopic(OSTicketBase):
     """Help topic model"""
     
     __tablename__ = "ost_help_topic"
     
-    topic_id = Column(Integer, primary_key=True, autoincrement=True)
-    topic_pid = Column(Integer, nullable=False, default=0)
-    isactive = Column(Boolean, nullable=False, default=True)
-    ispublic = Column(Boolean, nullable=False, default=True)
-    noautoresp = Column(Boolean, nullable=False, default=False)
-    flags = Column(Integer, nullable=False, default=0)
-    status_id = Column(Integer, nullable=False, default=0)
-    priority_id = Column(Integer, nullable=False, default=0)
-    dept_id = Column(Integer, nullable=False, default=0)
-    staff_id = Column(Integer, nullable=False, default=0)
-    team_id = Column(Integer, nullable=False, default=0)
-    sla_id = Column(Integer, nullable=False, default=0)
-    page_id = Column(Integer, nullable=False, default=0)
-    sequence_id = Column(Integer, nullable=False, default=0)
-    sort = Column(Integer, nullable=False, default=0)
-    topic = Column(String(32), nullable=False, default="", unique=True)
-    number_format = Column(String(32), nullable=False, default="")
-    notes = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    topic_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    topic_pid: Mapped[int] = mapped_column(server_default=text("0"))
+    isactive: Mapped[bool] = mapped_column(server_default=text("1"))
+    ispublic: Mapped[bool] = mapped_column(server_default=text("1"))
+    noautoresp: Mapped[bool] = mapped_column(server_default=text("0"))
+    flags: Mapped[int] = mapped_column(server_default=text("0"))
+    status_id: Mapped[int] = mapped_column(server_default=text("0"))
+    priority_id: Mapped[int] = mapped_column(server_default=text("0"))
+    dept_id: Mapped[int] = mapped_column(server_default=text("0"))
+    staff_id: Mapped[int] = mapped_column(server_default=text("0"))
+    team_id: Mapped[int] = mapped_column(server_default=text("0"))
+    sla_id: Mapped[int] = mapped_column(server_default=text("0"))
+    page_id: Mapped[int] = mapped_column(server_default=text("0"))
+    sequence_id: Mapped[int] = mapped_column(server_default=text("0"))
+    sort: Mapped[int] = mapped_column(server_default=text("0"))
+    topic: Mapped[str] = mapped_column(String(32), server_default=text("''"), unique=True)
+    number_format: Mapped[str] = mapped_column(String(32), server_default=text("''"))
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+    created: Mapped[datetime] = mapped_column()
+    updated: Mapped[datetime] = mapped_column()
+    
+    @classmethod
+    def get_by_id(cls, session: Session, topic_id: int) -> Optional["HelpTopic"]:
+        """Fetch help topic by id"""
+        return session.scalar(_get_help_topic_by_id, {"id": topic_id})
     
     def __repr__(self):
         return f"<HelpTopic(topic_id={self.topic_id}, topic='{self.topic}')>"
@@ -85,11 +92,14 @@ class HelpTopicForm(OSTicketBase):
     
     __tablename__ = "ost_help_topic_form"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    topic_id = Column(Integer, nullable=False, default=0)
-    form_id = Column(Integer, nullable=False, default=0)
-    sort = Column(Integer, nullable=False, default=1)
-    extra = Column(Text, nullable=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    topic_id: Mapped[int] = mapped_column(server_default=text("0"))
+    form_id: Mapped[int] = mapped_column(server_default=text("0"))
+    sort: Mapped[int] = mapped_column(server_default=text("1"))
+    extra: Mapped[Optional[str]] = mapped_column(Text)
     
     def __repr__(self):
-        return f"<HelpTopicForm(id={self.id}, topic_id={self.topic_id}, form_id={self.form_id})>"
\ No newline at end of file
+        return f"<HelpTopicForm(id={self.id}, topic_id={self.topic_id}, form_id={self.form_id})>"
+
+# Prebuilt statements for hot single-row lookups, reused from the compiled cache
+_get_help_topic_by_id = select(HelpTopic).where(HelpTopic.topic_id == bindparam("id"))
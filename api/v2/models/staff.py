@@ -2,49 +2,76 @@
 Staff, department, and team related database models for OSTicket API v2
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Enum
-from sqlalchemy.orm import relationship
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import String, Text, Enum, Row, bindparam, func, select, text
+from sqlalchemy.orm import Mapped, mapped_column, relationship, aliased, Bundle, Session
 from .base import OSTicketBase
+from .types import OrjsonType
 
 class Staff(OSTicketBase):
     """Staff model"""
     
     __tablename__ = "ost_staff"
     
-    staff_id = Column(Integer, primary_key=True, autoincrement=True)
-    dept_id = Column(Integer, nullable=False, default=0)
-    role_id = Column(Integer, nullable=False, default=0)
-    username = Column(String(32), nullable=False, default="", unique=True)
-    firstname = Column(String(32), nullable=True)
-    lastname = Column(String(32), nullable=True)
-    passwd = Column(String(128), nullable=True)
-    backend = Column(String(32), nullable=True)
-    email = Column(String(255), nullable=True)
-    phone = Column(String(24), nullable=False, default="")
-    phone_ext = Column(String(6), nullable=True)
-    mobile = Column(String(24), nullable=False, default="")
-    signature = Column(Text, nullable=False)
-    lang = Column(String(16), nullable=True)
-    timezone = Column(String(64), nullable=True)
-    locale = Column(String(16), nullable=True)
-    notes = Column(Text, nullable=True)
-    isactive = Column(Boolean, nullable=False, default=True)
-    isadmin = Column(Boolean, nullable=False, default=False)
-    isvisible = Column(Boolean, nullable=False, default=True)
-    onvacation = Column(Boolean, nullable=False, default=False)
-    assigned_only = Column(Boolean, nullable=False, default=False)
-    show_assigned_tickets = Column(Boolean, nullable=False, default=False)
-    change_passwd = Column(Boolean, nullable=False, default=False)
-    max_page_size = Column(Integer, nullable=False, default=0)
-    auto_refresh_rate = Column(Integer, nullable=False, default=0)
-    default_signature_type = Column(Enum('none', 'mine', 'dept', name='staff_signature_type'), nullable=False, default='none')
-    default_paper_size = Column(Enum('Letter', 'Legal', 'Ledger', 'A4', 'A3', name='staff_paper_size'), nullable=False, default='Letter')
-    extra = Column(Text, nullable=True)
-    permissions = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    lastlogin = Column(DateTime, nullable=True)
-    passwdreset = Column(DateTime, nullable=True)
-    updated = Column(DateTime, nullable=False)
+    staff_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    dept_id: Mapped[int] = mapped_column(server_default=text("0"))
+    role_id: Mapped[int] = mapped_column(server_default=text("0"))
+    username: Mapped[str] = mapped_column(String(32), server_default=text("''"), unique=True)
+    firstname: Mapped[Optional[str]] = mapped_column(String(32))
+    lastname: Mapped[Optional[str]] = mapped_column(String(32))
+    passwd: Mapped[Optional[str]] = mapped_column(String(128))
+    backend: Mapped[Optional[str]] = mapped_column(String(32))
+    email: Mapped[Optional[str]] = mapped_column(String(255))
+    phone: Mapped[str] = mapped_column(String(24), server_default=text("''"))
+    phone_ext: Mapped[Optional[str]] = mapped_column(String(6))
+    mobile: Mapped[str] = mapped_column(String(24), server_default=text("''"))
+    signature: Mapped[str] = mapped_column(Text)
+    lang: Mapped[Optional[str]] = mapped_column(String(16))
+    timezone: Mapped[Optional[str]] = mapped_column(String(64))
+    locale: Mapped[Optional[str]] = mapped_column(String(16))
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+    isactive: Mapped[bool] = mapped_column(server_default=text("1"))
+    isadmin: Mapped[bool] = mapped_column(server_default=text("0"))
+    isvisible: Mapped[bool] = mapped_column(server_default=text("1"))
+    onvacation: Mapped[bool] = mapped_column(server_default=text("0"))
+    assigned_only: Mapped[bool] = mapped_column(server_default=text("0"))
+    show_assigned_tickets: Mapped[bool] = mapped_column(server_default=text("0"))
+    change_passwd: Mapped[bool] = mapped_column(server_default=text("0"))
+    max_page_size: Mapped[int] = mapped_column(server_default=text("0"))
+    auto_refresh_rate: Mapped[int] = mapped_column(server_default=text("0"))
+    default_signature_type: Mapped[str] = mapped_column(Enum('none', 'mine', 'dept', name='staff_signature_type'), server_default=text("'none'"))
+    default_paper_size: Mapped[str] = mapped_column(Enum('Letter', 'Legal', 'Ledger', 'A4', 'A3', name='staff_paper_size'), server_default=text("'Letter'"))
+    extra: Mapped[Optional[str]] = mapped_column(Text)
+    permissions: Mapped[Optional[dict]] = mapped_column(OrjsonType)
+    created: Mapped[datetime] = mapped_column()
+    lastlogin: Mapped[Optional[datetime]] = mapped_column()
+    passwdreset: Mapped[Optional[datetime]] = mapped_column()
+    updated: Mapped[datetime] = mapped_column()
+    
+    # Read-only membership paths through the association models
+    teams: Mapped[List["Team"]] = relationship(
+        secondary=lambda: TeamMember.__table__,
+        primaryjoin="Staff.staff_id == foreign(TeamMember.staff_id)",
+        secondaryjoin="Team.team_id == foreign(TeamMember.team_id)",
+        viewonly=True,
+    )
+    extended_departments: Mapped[List["Department"]] = relationship(
+        secondary=lambda: StaffDeptAccess.__table__,
+        primaryjoin="Staff.staff_id == foreign(StaffDeptAccess.staff_id)",
+        secondaryjoin="Department.id == foreign(StaffDeptAccess.dept_id)",
+        viewonly=True,
+    )
+    
+    @classmethod
+    def get_by_id(cls, session: Session, staff_id: int) -> Optional["Staff"]:
+        """Fetch staff member by id"""
+        return session.scalar(_get_staff_by_id, {"id": staff_id})
+    
+    @classmethod
+    def get_by_username(cls, session: Session, username: str) -> Optional["Staff"]:
+        """Fetch staff member by username"""
+        return session.scalar(_get_staff_by_username, {"u": username})
     
     def __repr__(self):
         return f"<Staff(staff_id={self.staff_id}, username='{self.username}', email='{self.email}')>"
@@ -54,24 +81,45 @@ class Department(OSTicketBase):
     
     __tablename__ = "ost_department"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    pid = Column(Integer, nullable=True, default=None)  # Parent department
-    tpl_id = Column(Integer, nullable=False, default=0)
-    sla_id = Column(Integer, nullable=False, default=0)
-    schedule_id = Column(Integer, nullable=False, default=0)
-    email_id = Column(Integer, nullable=False, default=0)
-    autoresp_email_id = Column(Integer, nullable=False, default=0)
-    manager_id = Column(Integer, nullable=False, default=0)
-    flags = Column(Integer, nullable=False, default=0)
-    name = Column(String(128), nullable=False, default="")
-    signature = Column(Text, nullable=False)
-    ispublic = Column(Boolean, nullable=False, default=True)
-    group_membership = Column(Boolean, nullable=False, default=False)
-    ticket_auto_response = Column(Boolean, nullable=False, default=True)
-    message_auto_response = Column(Boolean, nullable=False, default=False)
-    path = Column(String(128), nullable=False, default="/")
-    updated = Column(DateTime, nullable=False)
-    created = Column(DateTime, nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    pid: Mapped[Optional[int]] = mapped_column()  # Parent department
+    tpl_id: Mapped[int] = mapped_column(server_default=text("0"))
+    sla_id: Mapped[int] = mapped_column(server_default=text("0"))
+    schedule_id: Mapped[int] = mapped_column(server_default=text("0"))
+    email_id: Mapped[int] = mapped_column(server_default=text("0"))
+    autoresp_email_id: Mapped[int] = mapped_column(server_default=text("0"))
+    manager_id: Mapped[int] = mapped_column(server_default=text("0"))
+    flags: Mapped[int] = mapped_column(server_default=text("0"))
+    name: Mapped[str] = mapped_column(String(128), server_default=text("''"))
+    signature: Mapped[str] = mapped_column(Text)
+    ispublic: Mapped[bool] = mapped_column(server_default=text("1"))
+    group_membership: Mapped[bool] = mapped_column(server_default=text("0"))
+    ticket_auto_response: Mapped[bool] = mapped_column(server_default=text("1"))
+    message_auto_response: Mapped[bool] = mapped_column(server_default=text("0"))
+    path: Mapped[str] = mapped_column(String(128), server_default=text("'/'"), index=True)  # e.g. "/1/3/", includes own id
+    updated: Mapped[datetime] = mapped_column()
+    created: Mapped[datetime] = mapped_column()
+    
+    @classmethod
+    def get_by_id(cls, session: Session, dept_id: int) -> Optional["Department"]:
+        """Fetch department by id"""
+        return session.scalar(_get_department_by_id, {"id": dept_id})
+    
+    @classmethod
+    def descendants(cls, session: Session, dept_id: int) -> List["Department"]:
+        """Fetch all sub-departments below dept_id with one path prefix query"""
+        root = aliased(cls)
+        root_path = select(root.path).where(root.id == dept_id).scalar_subquery()
+        stmt = select(cls).where(cls.path.like(func.concat(root_path, "%")), cls.id != dept_id)
+        return list(session.scalars(stmt))
+    
+    def ancestors(self, session: Session) -> List["Department"]:
+        """Fetch parent departments from the root down, parsed from path"""
+        ids = [int(part) for part in self.path.split("/") if part and int(part) != self.id]
+        if not ids:
+            return []
+        by_id = {dept.id: dept for dept in session.scalars(select(Department).where(Department.id.in_(ids)))}
+        return [by_id[i] for i in ids if i in by_id]
     
     def __repr__(self):
         return f"<Department(id={self.id}, name='{self.name}')>"
@@ -81,13 +129,21 @@ class Team(OSTicketBase):
     
     __tablename__ = "ost_team"
     
-    team_id = Column(Integer, primary_key=True, autoincrement=True)
-    lead_id = Column(Integer, nullable=False, default=0)
-    flags = Column(Integer, nullable=False, default=1)
-    name = Column(String(125), nullable=False, default="", unique=True)
-    notes = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    team_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    lead_id: Mapped[int] = mapped_column(server_default=text("0"))
+    flags: Mapped[int] = mapped_column(server_default=text("1"))
+    name: Mapped[str] = mapped_column(String(125), server_default=text("''"), unique=True)
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+    created: Mapped[datetime] = mapped_column()
+    updated: Mapped[datetime] = mapped_column()
+    
+    # Read-only membership path through TeamMember
+    members: Mapped[List["Staff"]] = relationship(
+        secondary=lambda: TeamMember.__table__,
+        primaryjoin="Team.team_id == foreign(TeamMember.team_id)",
+        secondaryjoin="Staff.staff_id == foreign(TeamMember.staff_id)",
+        viewonly=True,
+    )
     
     def __repr__(self):
         return f"<Team(team_id={self.team_id}, name='{self.name}')>"
@@ -97,9 +153,9 @@ class TeamMember(OSTicketBase):
     
     __tablename__ = "ost_team_member"
     
-    team_id = Column(Integer, primary_key=True)
-    staff_id = Column(Integer, primary_key=True)
-    flags = Column(Integer, nullable=False, default=0)
+    team_id: Mapped[int] = mapped_column(primary_key=True)
+    staff_id: Mapped[int] = mapped_column(primary_key=True)
+    flags: Mapped[int] = mapped_column(server_default=text("0"))
     
     def __repr__(self):
         return f"<TeamMember(team_id={self.team_id}, staff_id={self.staff_id})>"
@@ -109,13 +165,18 @@ class Role(OSTicketBase):
     
     __tablename__ = "ost_role"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    flags = Column(Integer, nullable=False, default=1)
-    name = Column(String(64), nullable=True, unique=True)
-    permissions = Column(Text, nullable=True)
-    notes = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    flags: Mapped[int] = mapped_column(server_default=text("1"))
+    name: Mapped[Optional[str]] = mapped_column(String(64), unique=True)
+    permissions: Mapped[Optional[dict]] = mapped_column(OrjsonType)
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+    created: Mapped[datetime] = mapped_column()
+    updated: Mapped[datetime] = mapped_column()
+    
+    @classmethod
+    def get_by_id(cls, session: Session, role_id: int) -> Optional["Role"]:
+        """Fetch role by id"""
+        return session.scalar(_get_role_by_id, {"id": role_id})
     
     def __repr__(self):
         return f"<Role(id={self.id}, name='{self.name}')>"
@@ -125,10 +186,10 @@ class StaffDeptAccess(OSTicketBase):
     
     __tablename__ = "ost_staff_dept_access"
     
-    staff_id = Column(Integer, primary_key=True)
-    dept_id = Column(Integer, primary_key=True)
-    role_id = Column(Integer, nullable=False, default=0)
-    flags = Column(Integer, nullable=False, default=1)
+    staff_id: Mapped[int] = mapped_column(primary_key=True)
+    dept_id: Mapped[int] = mapped_column(primary_key=True)
+    role_id: Mapped[int] = mapped_column(server_default=text("0"))
+    flags: Mapped[int] = mapped_column(server_default=text("1"))
     
     def __repr__(self):
         return f"<StaffDeptAccess(staff_id={self.staff_id}, dept_id={self.dept_id})>"
@@ -138,14 +199,14 @@ class SLA(OSTicketBase):
     
     __tablename__ = "ost_sla"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    schedule_id = Column(Integer, nullable=False, default=0)
-    flags = Column(Integer, nullable=False, default=3)
-    grace_period = Column(Integer, nullable=False, default=0)
-    name = Column(String(64), nullable=False, default="", unique=True)
-    notes = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    schedule_id: Mapped[int] = mapped_column(server_default=text("0"))
+    flags: Mapped[int] = mapped_column(server_default=text("3"))
+    grace_period: Mapped[int] = mapped_column(server_default=text("0"))
+    name: Mapped[str] = mapped_column(String(64), server_default=text("''"), unique=True)
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+    created: Mapped[datetime] = mapped_column()
+    updated: Mapped[datetime] = mapped_column()
     
     def __repr__(self):
         return f"<SLA(id={self.id}, name='{self.name}')>"
@@ -155,13 +216,13 @@ class Schedule(OSTicketBase):
     
     __tablename__ = "ost_schedule"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    flags = Column(Integer, nullable=False, default=0)
-    name = Column(String(255), nullable=False)
-    timezone = Column(String(64), nullable=True)
-    description = Column(String(255), nullable=False)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    flags: Mapped[int] = mapped_column(server_default=text("0"))
+    name: Mapped[str] = mapped_column(String(255))
+    timezone: Mapped[Optional[str]] = mapped_column(String(64))
+    description: Mapped[str] = mapped_column(String(255))
+    created: Mapped[datetime] = mapped_column()
+    updated: Mapped[datetime] = mapped_column()
     
     def __repr__(self):
         return f"<Schedule(id={self.id}, name='{self.name}')>"
@@ -171,22 +232,22 @@ class ScheduleEntry(OSTicketBase):
     
     __tablename__ = "ost_schedule_entry"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    schedule_id = Column(Integer, nullable=False, default=0)
-    flags = Column(Integer, nullable=False, default=0)
-    sort = Column(Integer, nullable=False, default=0)
-    name = Column(String(255), nullable=False)
-    repeats = Column(Enum('never', 'daily', 'weekly', 'monthly', name='schedule_repeat'), nullable=False, default='never')
-    starts_on = Column(DateTime, nullable=True)
-    starts_at = Column(String(10), nullable=True)
-    ends_on = Column(DateTime, nullable=True)
-    ends_at = Column(String(10), nullable=True)
-    day_of_week = Column(Integer, nullable=True)
-    week_of_month = Column(Integer, nullable=True)
-    day_of_month = Column(Integer, nullable=True)
-    month_of_year = Column(Integer, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    schedule_id: Mapped[int] = mapped_column(server_default=text("0"))
+    flags: Mapped[int] = mapped_column(server_default=text("0"))
+    sort: Mapped[int] = mapped_column(server_default=text("0"))
+    name: Mapped[str] = mapped_column(String(255))
+    repeats: Mapped[str] = mapped_column(Enum('never', 'daily', 'weekly', 'monthly', name='schedule_repeat'), server_default=text("'never'"))
+    starts_on: Mapped[Optional[datetime]] = mapped_column()
+    starts_at: Mapped[Optional[str]] = mapped_column(String(10))
+    ends_on: Mapped[Optional[datetime]] = mapped_column()
+    ends_at: Mapped[Optional[str]] = mapped_column(String(10))
+    day_of_week: Mapped[Optional[int]] = mapped_column()
+    week_of_month: Mapped[Optional[int]] = mapped_column()
+    day_of_month: Mapped[Optional[int]] = mapped_column()
+    month_of_year: Mapped[Optional[int]] = mapped_column()
+    created: Mapped[datetime] = mapped_column()
+    updated: Mapped[datetime] = mapped_column()
     
     def __repr__(self):
         return f"<ScheduleEntry(id={self.id}, schedule_id={self.schedule_id}, name='{self.name}')>"
@@ -196,13 +257,41 @@ class Group(OSTicketBase):
     
     __tablename__ = "ost_group"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    role_id = Column(Integer, nullable=False, default=0)
-    flags = Column(Integer, nullable=False, default=1)
-    name = Column(String(120), nullable=False, default="")
-    notes = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    role_id: Mapped[int] = mapped_column(server_default=text("0"))
+    flags: Mapped[int] = mapped_column(server_default=text("1"))
+    name: Mapped[str] = mapped_column(String(120), server_default=text("''"))
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+    created: Mapped[datetime] = mapped_column()
+    updated: Mapped[datetime] = mapped_column()
     
     def __repr__(self):
-        return f"<Group(id={self.id}, name='{self.name}')>"
\ No newline at end of file
+        return f"<Group(id={self.id}, name='{self.name}')>"
+
+# Prebuilt statements for hot single-row lookups, reused from the compiled cache
+_get_staff_by_id = select(Staff).where(Staff.staff_id == bindparam("id"))
+_get_staff_by_username = select(Staff).where(Staff.username == bindparam("u"))
+_get_department_by_id = select(Department).where(Department.id == bindparam("id"))
+_get_role_by_id = select(Role).where(Role.id == bindparam("id"))
+
+def get_active_staff_rows(session: Session) -> list[Row]:
+    """Fetch active staff as lightweight row tuples for permission checks
+    
+    Returns (staff_id, username, dept_id, role_id, isactive) rows without
+    hydrating full Staff instances.
+    """
+    stmt = select(
+        Staff.staff_id, Staff.username, Staff.dept_id, Staff.role_id, Staff.isactive
+    ).where(Staff.isactive == True)
+    return session.execute(stmt).all()
+
+def get_staff_dept_access_rows(session: Session) -> list[Row]:
+    """Fetch extended department access of active staff as (staff, access) bundles"""
+    staff = Bundle("staff", Staff.staff_id, Staff.username)
+    access = Bundle("access", StaffDeptAccess.dept_id, StaffDeptAccess.role_id, StaffDeptAccess.flags)
+    stmt = (
+        select(staff, access)
+        .join(StaffDeptAccess, StaffDeptAccess.staff_id == Staff.staff_id)
+        .where(Staff.isactive == True)
+    )
+    return session.execute(stmt).all()
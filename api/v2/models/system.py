@@ -2,33 +2,30 @@
 Additional system models for OSTicket API v2
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Enum, LargeBinary
-from sqlalchemy.orm import relationship
-from .base import OSTicketBase
+from enum import Enum as PyEnum
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Enum, LargeBinary, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import column_property, deferred, relationship, Session
+from .base import OSTicketBase, ReprMixin, TimestampMixin, int_column, str_column
 
-class Queue(OSTicketBase):
+class Queue(OSTicketBase, TimestampMixin, ReprMixin):
     """Queue model"""
     
     __tablename__ = "ost_queue"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    parent_id = Column(Integer, nullable=False, default=0)
-    columns_id = Column(Integer, nullable=False, default=0)
-    sort_id = Column(Integer, nullable=False, default=0)
-    flags = Column(Integer, nullable=False, default=0)
-    staff_id = Column(Integer, nullable=False, default=0)
-    title = Column(String(60), nullable=False, default="")
-    config = Column(Text, nullable=True)
-    filter = Column(String(64), nullable=False, default="")
-    root = Column(String(32), nullable=False, default="T")
-    path = Column(String(80), nullable=False, default="/")
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
-    
-    def __repr__(self):
-        return f"<Queue(id={self.id}, title='{self.title}')>"
+    parent_id = int_column()
+    columns_id = int_column()
+    sort_id = int_column()
+    flags = int_column()
+    staff_id = int_column()
+    title = str_column(60)
+    config = deferred(Column(Text, nullable=True), group="content")
+    filter = str_column(64)
+    root = str_column(32, "T")
+    path = str_column(80, "/")
 
-class QueueColumn(OSTicketBase):
+class QueueColumn(OSTicketBase, ReprMixin):
     """Queue column model"""
     
     __tablename__ = "ost_queue_column"
@@ -42,11 +39,8 @@ class QueueColumn(OSTicketBase):
     annotations = Column(Text, nullable=True)
     conditions = Column(Text, nullable=True)
     extra = Column(Text, nullable=True)
-    
-    def __repr__(self):
-        return f"<QueueColumn(id={self.id}, name='{self.name}')>"
 
-class QueueColumns(OSTicketBase):
+class QueueColumns(OSTicketBase, ReprMixin):
     """Queue columns model"""
     
     __tablename__ = "ost_queue_columns"
@@ -54,15 +48,12 @@ class QueueColumns(OSTicketBase):
     queue_id = Column(Integer, primary_key=True)
     column_id = Column(Integer, primary_key=True)
     staff_id = Column(Integer, primary_key=True)
-    bits = Column(Integer, nullable=False, default=0)
-    sort = Column(Integer, nullable=False, default=1)
+    bits = int_column()
+    sort = int_column(1)
     heading = Column(String(64), nullable=True)
-    width = Column(Integer, nullable=False, default=100)
-    
-    def __repr__(self):
-        return f"<QueueColumns(queue_id={self.queue_id}, column_id={self.column_id}, staff_id={self.staff_id})>"
+    width = int_column(100)
 
-class QueueConfig(OSTicketBase):
+class QueueConfig(OSTicketBase, ReprMixin):
     """Queue configuration model"""
     
     __tablename__ = "ost_queue_config"
@@ -71,110 +62,100 @@ class QueueConfig(OSTicketBase):
     staff_id = Column(Integer, primary_key=True)
     setting = Column(Text, nullable=True)
     updated = Column(DateTime, nullable=False)
-    
-    def __repr__(self):
-        return f"<QueueConfig(queue_id={self.queue_id}, staff_id={self.staff_id})>"
 
-class QueueExport(OSTicketBase):
+class QueueExport(OSTicketBase, ReprMixin):
     """Queue export model"""
     
     __tablename__ = "ost_queue_export"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    queue_id = Column(Integer, nullable=False, default=0)
-    path = Column(String(64), nullable=False, default="")
+    queue_id = int_column()
+    path = str_column(64)
     heading = Column(String(64), nullable=True)
-    sort = Column(Integer, nullable=False, default=1)
-    
-    def __repr__(self):
-        return f"<QueueExport(id={self.id}, queue_id={self.queue_id}, path='{self.path}')>"
+    sort = int_column(1)
 
-class QueueSort(OSTicketBase):
+class QueueSort(OSTicketBase, ReprMixin):
     """Queue sort model"""
     
     __tablename__ = "ost_queue_sort"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    root = Column(String(32), nullable=False, default="T")
-    name = Column(String(64), nullable=False, default="")
-    columns = Column(Text, nullable=True)
+    root = str_column(32, "T")
+    name = str_column(64)
+    columns = deferred(Column(Text, nullable=True), group="content")
     updated = Column(DateTime, nullable=False)
-    
-    def __repr__(self):
-        return f"<QueueSort(id={self.id}, name='{self.name}', root='{self.root}')>"
 
-class QueueSorts(OSTicketBase):
+class QueueSorts(OSTicketBase, ReprMixin):
     """Queue sorts model"""
     
     __tablename__ = "ost_queue_sorts"
     
     queue_id = Column(Integer, primary_key=True)
     sort_id = Column(Integer, primary_key=True)
-    bits = Column(Integer, nullable=False, default=0)
-    sort = Column(Integer, nullable=False, default=0)
-    
-    def __repr__(self):
-        return f"<QueueSorts(queue_id={self.queue_id}, sort_id={self.sort_id})>"
+    bits = int_column()
+    sort = int_column()
 
-class Filter(OSTicketBase):
+class Filter(OSTicketBase, TimestampMixin, ReprMixin):
     """Filter model"""
     
     __tablename__ = "ost_filter"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    execorder = Column(Integer, nullable=False, default=99)
+    execorder = int_column(99)
     isactive = Column(Boolean, nullable=False, default=True)
-    flags = Column(Integer, nullable=False, default=0)
-    status = Column(Integer, nullable=False, default=0)
+    flags = int_column()
+    status = int_column()
     match_all_rules = Column(Boolean, nullable=False, default=False)
     stop_onmatch = Column(Boolean, nullable=False, default=False)
-    target = Column(String(8), nullable=False, default="")
-    email_id = Column(Integer, nullable=False, default=0)
-    priority_id = Column(Integer, nullable=False, default=0)
-    dept_id = Column(Integer, nullable=False, default=0)
-    staff_id = Column(Integer, nullable=False, default=0)
-    team_id = Column(Integer, nullable=False, default=0)
-    sla_id = Column(Integer, nullable=False, default=0)
-    topic_id = Column(Integer, nullable=False, default=0)
+    target = str_column(8)
+    email_id = int_column()
+    priority_id = int_column()
+    dept_id = int_column()
+    staff_id = int_column()
+    team_id = int_column()
+    sla_id = int_column()
+    topic_id = int_column()
     name = Column(String(32), nullable=False, default="", unique=True)
     notes = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
-    
-    def __repr__(self):
-        return f"<Filter(id={self.id}, name='{self.name}')>"
 
-class FilterRule(OSTicketBase):
+class FilterRuleHow(str, PyEnum):
+    """Comparison a filter rule applies to its value"""
+    EQUAL = "equal"
+    NOT_EQUAL = "not_equal"
+    CONTAINS = "contains"
+    DN_CONTAIN = "dn_contain"
+    STARTS = "starts"
+    ENDS = "ends"
+    MATCH = "match"
+    NOT_MATCH = "not_match"
+
+class FilterRule(OSTicketBase, ReprMixin):
     """Filter rule model"""
     
     __tablename__ = "ost_filter_rule"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    filter_id = Column(Integer, nullable=False, default=0)
-    what = Column(String(32), nullable=False, default="")
-    how = Column(Enum('equal', 'not_equal', 'contains', 'dn_contain', 'starts', 'ends', 'match', 'not_match', name='filter_rule_how'), nullable=False, default='equal')
-    val = Column(String(255), nullable=False, default="")
-    
-    def __repr__(self):
-        return f"<FilterRule(id={self.id}, filter_id={self.filter_id}, what='{self.what}')>"
+    filter_id = int_column()
+    what = str_column(32)
+    how = Column(
+        Enum(FilterRuleHow, name='filter_rule_how', values_callable=lambda e: [m.value for m in e]),
+        nullable=False,
+        default=FilterRuleHow.EQUAL,
+    )
+    val = str_column(255)
 
-class FilterAction(OSTicketBase):
+class FilterAction(OSTicketBase, TimestampMixin, ReprMixin):
     """Filter action model"""
     
     __tablename__ = "ost_filter_action"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    filter_id = Column(Integer, nullable=False, default=0)
-    sort = Column(Integer, nullable=False, default=0)
-    type = Column(String(24), nullable=False, default="")
+    filter_id = int_column()
+    sort = int_column()
+    type = str_column(24)
     configuration = Column(Text, nullable=True)
-    updated = Column(DateTime, nullable=False)
-    created = Column(DateTime, nullable=False)
-    
-    def __repr__(self):
-        return f"<FilterAction(id={self.id}, filter_id={self.filter_id}, type='{self.type}')>"
 
-class Plugin(OSTicketBase):
+class Plugin(OSTicketBase, ReprMixin):
     """Plugin model"""
     
     __tablename__ = "ost_plugin"
@@ -186,88 +167,97 @@ class Plugin(OSTicketBase):
     isactive = Column(Boolean, nullable=False, default=False)
     version = Column(String(64), nullable=True)
     installed = Column(DateTime, nullable=False)
-    
-    def __repr__(self):
-        return f"<Plugin(id={self.id}, name='{self.name}', version='{self.version}')>"
 
-class PluginInstance(OSTicketBase):
+class PluginInstance(OSTicketBase, TimestampMixin, ReprMixin):
     """Plugin instance model"""
     
     __tablename__ = "ost_plugin_instance"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     plugin_id = Column(Integer, nullable=False)
-    flags = Column(Integer, nullable=False, default=0)
-    name = Column(String(255), nullable=False, default="")
+    flags = int_column()
+    name = str_column(255)
     instance = Column(String(128), nullable=True)
-    config = Column(Text, nullable=True)
+    config = deferred(Column(Text, nullable=True), group="content")
     extra = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
-    
-    def __repr__(self):
-        return f"<PluginInstance(id={self.id}, plugin_id={self.plugin_id}, name='{self.name}')>"
 
-class Task(OSTicketBase):
+class Task(OSTicketBase, TimestampMixin, ReprMixin):
     """Task model"""
     
     __tablename__ = "ost_task"
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    object_id = Column(Integer, nullable=False, default=0)
-    object_type = Column(String(1), nullable=False, default="T")
+    object_id = int_column()
+    object_type = str_column(1, "T")
     number = Column(String(20), nullable=True)
-    flags = Column(Integer, nullable=False, default=0)
+    flags = int_column()
     duedate = Column(DateTime, nullable=True)
     closed = Column(DateTime, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
-    
-    def __repr__(self):
-        return f"<Task(id={self.id}, number='{self.number}', object_id={self.object_id})>"
 
-class TaskCData(OSTicketBase):
+class TaskCData(OSTicketBase, ReprMixin):
     """Task custom data model"""
     
     __tablename__ = "ost_task__cdata"
     
     task_id = Column(Integer, primary_key=True)
     title = Column(Text, nullable=True)
-    description = Column(Text, nullable=True)
-    
-    def __repr__(self):
-        return f"<TaskCData(task_id={self.task_id})>"
+    description = deferred(Column(Text, nullable=True), group="content")
+
+# The title lives in the 1:1 ost_task__cdata row; read it as a correlated
+# subquery so task lists get it in the same SELECT
+Task.title = column_property(
+    select(TaskCData.title).where(TaskCData.task_id == Task.id).scalar_subquery()
+)
 
-class List(OSTicketBase):
+class List(OSTicketBase, TimestampMixin, ReprMixin):
     """List model"""
     
     __tablename__ = "ost_list"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    name = Column(String(255), nullable=False, default="")
-    name_plural = Column(String(255), nullable=False, default="")
-    label = Column(String(255), nullable=False, default="")
+    name = str_column(255)
+    name_plural = str_column(255)
+    label = str_column(255)
     type = Column(String(16), nullable=True, default=None)
-    configuration = Column(Text, nullable=True)
+    configuration = deferred(Column(Text, nullable=True), group="content")
     notes = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
-    
-    def __repr__(self):
-        return f"<List(id={self.id}, name='{self.name}')>"
 
-class ListItems(OSTicketBase):
+class ListItems(OSTicketBase, ReprMixin):
     """List items model"""
     
     __tablename__ = "ost_list_items"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    list_id = Column(Integer, nullable=False, default=0)
-    status = Column(Integer, nullable=False, default=1)
-    value = Column(String(255), nullable=False, default="")
+    list_id = int_column()
+    status = int_column(1)
+    value = str_column(255)
     extra = Column(String(255), nullable=True)
-    sort = Column(Integer, nullable=False, default=1)
+    sort = int_column(1)
     properties = Column(Text, nullable=True)
-    
-    def __repr__(self):
-        return f"<ListItems(id={self.id}, list_id={self.list_id}, value='{self.value}')>"
\ No newline at end of file
+
+def upsert_queue_columns(session: Session, rows: list[dict]) -> None:
+    """Insert or update queue columns keyed on (queue_id, column_id, staff_id) in a single statement"""
+    if not rows:
+        return
+    
+    stmt = mysql_insert(QueueColumns).values(rows)
+    stmt = stmt.on_duplicate_key_update(
+        bits=stmt.inserted.bits,
+        sort=stmt.inserted.sort,
+        heading=stmt.inserted.heading,
+        width=stmt.inserted.width,
+    )
+    session.execute(stmt)
+
+def upsert_queue_sorts(session: Session, rows: list[dict]) -> None:
+    """Insert or update queue sorts keyed on (queue_id, sort_id) in a single statement"""
+    if not rows:
+        return
+    
+    stmt = mysql_insert(QueueSorts).values(rows)
+    stmt = stmt.on_duplicate_key_update(
+        bits=stmt.inserted.bits,
+        sort=stmt.inserted.sort,
+    )
+    session.execute(stmt)
@@ -2,38 +2,83 @@
 Ticket-related database models for OSTicket API v2
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Enum, ForeignKey
-from sqlalchemy.orm import relationship
-from .base import OSTicketBase
+from enum import Enum as PyEnum
+from typing import List, Optional
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Enum, ForeignKey, Index, Row, Select, bindparam, insert, select
+from sqlalchemy.orm import column_property, deferred, relationship, raiseload, selectinload, undefer_group, with_polymorphic, Session
+from sqlalchemy.ext.hybrid import hybrid_property
+from ..cache import STATUS_BY_ID
+from .base import OSTicketBase, ReprMixin, TimestampMixin, int_column, str_column
 
-class Ticket(OSTicketBase):
+def _flag(mask: int, doc: str) -> hybrid_property:
+    """Boolean view of one bit in the row's flags column, usable in filters"""
+    def fget(self) -> bool:
+        return bool((self.flags or 0) & mask)
+    
+    def fset(self, value: bool) -> None:
+        self.flags = (self.flags or 0) | mask if value else (self.flags or 0) & ~mask
+    
+    def expr(cls):
+        return cls.flags.op("&")(mask) != 0
+    
+    fget.__doc__ = doc
+    return hybrid_property(fget, fset, expr=expr)
+
+class TicketSource(str, PyEnum):
+    """Channel a ticket was opened through"""
+    WEB = "Web"
+    EMAIL = "Email"
+    PHONE = "Phone"
+    API = "API"
+    OTHER = "Other"
+
+class Ticket(OSTicketBase, TimestampMixin, ReprMixin):
     """Ticket model"""
     
     __tablename__ = "ost_ticket"
+    __table_args__ = (
+        Index("ix_ticket_status_staff", "status_id", "staff_id"),
+        Index("ix_ticket_dept_status", "dept_id", "status_id"),
+        Index("ix_ticket_user_created", "user_id", "created"),
+        Index("ix_ticket_lastupdate", "lastupdate"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
     
     ticket_id = Column(Integer, primary_key=True, autoincrement=True)
     ticket_pid = Column(Integer, nullable=True)  # Parent ticket ID
-    number = Column(String(20), nullable=True)  # Human-readable ticket number
+    # Human-readable ticket number from the help topic/system number format
+    # (random digits or a sequence), so it cannot be derived from ticket_id
+    number = Column(String(20), nullable=True)
     
     # Foreign keys
-    user_id = Column(Integer, nullable=False, default=0)
-    user_email_id = Column(Integer, nullable=False, default=0)
-    status_id = Column(Integer, nullable=False, default=0)
-    dept_id = Column(Integer, nullable=False, default=0)
-    sla_id = Column(Integer, nullable=False, default=0)
-    topic_id = Column(Integer, nullable=False, default=0)
-    staff_id = Column(Integer, nullable=False, default=0)
-    team_id = Column(Integer, nullable=False, default=0)
-    email_id = Column(Integer, nullable=False, default=0)
-    lock_id = Column(Integer, nullable=False, default=0)
+    user_id = int_column()
+    user_email_id = int_column()
+    status_id = int_column()
+    dept_id = int_column()
+    sla_id = int_column()
+    topic_id = int_column()
+    staff_id = int_column()
+    team_id = int_column()
+    email_id = int_column()
+    lock_id = int_column()
     
     # Ticket attributes
-    flags = Column(Integer, nullable=False, default=0)
-    sort = Column(Integer, nullable=False, default=0)
-    ip_address = Column(String(64), nullable=False, default="")
-    source = Column(Enum('Web', 'Email', 'Phone', 'API', 'Other', name='ticket_source'), nullable=False, default='Other')
+    flags = int_column()
+    sort = int_column()
+    ip_address = str_column(64)
+    source = Column(
+        Enum(TicketSource, name='ticket_source', values_callable=lambda e: [m.value for m in e]),
+        nullable=False,
+        default=TicketSource.OTHER,
+    )
     source_extra = Column(String(40), nullable=True)
     
+    # Bits of flags, as defined by osTicket's Ticket class
+    combine_threads = _flag(0x0001, "Show child ticket threads combined")
+    separate_threads = _flag(0x0002, "Show child ticket threads separately")
+    is_linked = _flag(0x0008, "Ticket is linked to a parent")
+    is_parent = _flag(0x0010, "Ticket has merged or linked children")
+    
     # Status flags
     isoverdue = Column(Boolean, nullable=False, default=False)
     isanswered = Column(Boolean, nullable=False, default=False)
@@ -44,13 +89,40 @@ class Ticket(OSTicketBase):
     reopened = Column(DateTime, nullable=True)
     closed = Column(DateTime, nullable=True)
     lastupdate = Column(DateTime, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
     
-    def __repr__(self):
-        return f"<Ticket(ticket_id={self.ticket_id}, number='{self.number}', status_id={self.status_id})>"
+    # Relationships
+    department = relationship("Department", primaryjoin="foreign(Ticket.dept_id) == Department.id")
+    thread = relationship(
+        "Thread",
+        primaryjoin="and_(Ticket.ticket_id == foreign(Thread.object_id), Thread.object_type == 'T')",
+        uselist=False,
+        viewonly=True,
+    )
+    user = relationship("User", primaryjoin="foreign(Ticket.user_id) == User.id", back_populates="tickets")
+    staff = relationship("Staff", primaryjoin="foreign(Ticket.staff_id) == Staff.staff_id")
+    team = relationship("Team", primaryjoin="foreign(Ticket.team_id) == Team.team_id")
+    
+    @property
+    def status(self) -> Optional["TicketStatus"]:
+        """Ticket status, resolved from the startup lookup cache"""
+        return STATUS_BY_ID.get(self.status_id)
+    
+    @classmethod
+    def get_by_id(cls, session: Session, ticket_id: int) -> Optional["Ticket"]:
+        """Fetch ticket by id"""
+        return session.scalar(_get_ticket_by_id, {"id": ticket_id})
+    
+    @classmethod
+    def get_by_number(cls, session: Session, number: str) -> Optional["Ticket"]:
+        """Fetch ticket by its human-readable number"""
+        return session.scalar(_get_ticket_by_number, {"number": number})
+    
+    @classmethod
+    def get_by_status(cls, session: Session, status_id: int) -> List["Ticket"]:
+        """Fetch all tickets in a status"""
+        return list(session.scalars(_get_tickets_by_status, {"sid": status_id}))
 
-class TicketCData(OSTicketBase):
+class TicketCData(OSTicketBase, ReprMixin):
     """Ticket custom data model"""
     
     __tablename__ = "ost_ticket__cdata"
@@ -58,11 +130,22 @@ class TicketCData(OSTicketBase):
     ticket_id = Column(Integer, primary_key=True)
     subject = Column(Text, nullable=True)
     priority = Column(Text, nullable=True)
-    
-    def __repr__(self):
-        return f"<TicketCData(ticket_id={self.ticket_id})>"
 
-class TicketStatus(OSTicketBase):
+# Subject and priority live in the 1:1 ost_ticket__cdata row; read them as
+# correlated subqueries, deferred so only statements that undefer the "cdata"
+# group (e.g. ticket_list_query) pay for them
+Ticket.subject = column_property(
+    select(TicketCData.subject).where(TicketCData.ticket_id == Ticket.ticket_id).scalar_subquery(),
+    deferred=True,
+    group="cdata",
+)
+Ticket.priority = column_property(
+    select(TicketCData.priority).where(TicketCData.ticket_id == Ticket.ticket_id).scalar_subquery(),
+    deferred=True,
+    group="cdata",
+)
+
+class TicketStatus(OSTicketBase, TimestampMixin, ReprMixin):
     """Ticket status model"""
     
     __tablename__ = "ost_ticket_status"
@@ -70,88 +153,140 @@ class TicketStatus(OSTicketBase):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(60), nullable=False, default="", unique=True)
     state = Column(String(16), nullable=True)
-    mode = Column(Integer, nullable=False, default=0)
-    flags = Column(Integer, nullable=False, default=0)
-    sort = Column(Integer, nullable=False, default=0)
-    properties = Column(Text, nullable=False)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
-    
-    def __repr__(self):
-        return f"<TicketStatus(id={self.id}, name='{self.name}', state='{self.state}')>"
+    mode = int_column()
+    flags = int_column()
+    sort = int_column()
+    properties = deferred(Column(Text, nullable=False), group="content")
 
-class TicketPriority(OSTicketBase):
+class TicketPriority(OSTicketBase, ReprMixin):
     """Ticket priority model"""
     
     __tablename__ = "ost_ticket_priority"
     
     priority_id = Column(Integer, primary_key=True, autoincrement=True)
     priority = Column(String(60), nullable=False, default="", unique=True)
-    priority_desc = Column(String(30), nullable=False, default="")
-    priority_color = Column(String(7), nullable=False, default="")
+    priority_desc = str_column(30)
+    priority_color = str_column(7)
     priority_urgency = Column(Boolean, nullable=False, default=False)
     ispublic = Column(Boolean, nullable=False, default=True)
-    
-    def __repr__(self):
-        return f"<TicketPriority(priority_id={self.priority_id}, priority='{self.priority}')>"
 
-class Thread(OSTicketBase):
+class Thread(OSTicketBase, TimestampMixin, ReprMixin):
     """Thread model for ticket conversations"""
     
     __tablename__ = "ost_thread"
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    object_id = Column(Integer, nullable=False, default=0)
-    object_type = Column(String(1), nullable=False, default="T")  # T = Ticket
-    extra = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
-    
-    def __repr__(self):
-        return f"<Thread(id={self.id}, object_id={self.object_id}, object_type='{self.object_type}')>"
+    object_id = int_column()
+    object_type = str_column(1, "T")  # T = Ticket
+    extra = deferred(Column(Text, nullable=True), group="content")
+    
+    # Relationships
+    entries = relationship(
+        "ThreadEntry",
+        primaryjoin="Thread.id == foreign(ThreadEntry.thread_id)",
+        back_populates="thread",
+        order_by="ThreadEntry.id",
+    )
+    collaborators = relationship(
+        "ThreadCollaborator",
+        primaryjoin="Thread.id == foreign(ThreadCollaborator.thread_id)",
+        back_populates="thread",
+    )
+    
+    # Read-only filtered views for reporting; never flushed back
+    messages = relationship(
+        "MessageThreadEntry",
+        primaryjoin="Thread.id == foreign(MessageThreadEntry.thread_id)",
+        order_by="MessageThreadEntry.id",
+        viewonly=True,
+    )
+    active_collaborators = relationship(
+        "ThreadCollaborator",
+        primaryjoin="and_(Thread.id == foreign(ThreadCollaborator.thread_id), "
+                    "ThreadCollaborator.flags.op('&')(1) != 0)",  # Collaborator::FLAG_ACTIVE
+        viewonly=True,
+    )
 
-class ThreadEntry(OSTicketBase):
+class ThreadEntry(OSTicketBase, TimestampMixin, ReprMixin):
     """Thread entry model for messages, notes, etc."""
     
     __tablename__ = "ost_thread_entry"
+    __table_args__ = (
+        Index("ix_te_thread_type_created", "thread_id", "type", "created"),
+    )
+    __mapper_args__ = {"eager_defaults": True, "polymorphic_on": "type"}
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     thread_id = Column(Integer, nullable=False)
-    staff_id = Column(Integer, nullable=False, default=0)
-    user_id = Column(Integer, nullable=False, default=0)
-    
-    type = Column(String(1), nullable=False, default="M")  # M=Message, R=Response, N=Note
-    flags = Column(Integer, nullable=False, default=0)
-    poster = Column(String(128), nullable=False, default="")
-    editor = Column(Integer, nullable=False, default=0)
-    editor_type = Column(String(1), nullable=False, default="")
-    source = Column(String(8), nullable=False, default="")
+    staff_id = int_column()
+    user_id = int_column()
+    
+    type = str_column(1, "M")  # M=Message, R=Response, N=Note, B=Bounce
+    flags = int_column()
+    poster = str_column(128)
+    editor = int_column()
+    editor_type = str_column(1)
+    source = str_column(8)
     title = Column(String(255), nullable=True, default=None)
-    body = Column(Text, nullable=False)
-    format = Column(String(16), nullable=False, default="html")
-    ip_address = Column(String(64), nullable=False, default="")
-    extra = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    body = deferred(Column(Text, nullable=False), group="content")
+    format = str_column(16, "html")
+    ip_address = str_column(64)
+    extra = deferred(Column(Text, nullable=True), group="content")
+    
+    # Relationships
+    thread = relationship(
+        "Thread",
+        primaryjoin="Thread.id == foreign(ThreadEntry.thread_id)",
+        back_populates="entries",
+    )
+    staff = relationship("Staff", primaryjoin="foreign(ThreadEntry.staff_id) == Staff.staff_id")
+    user = relationship("User", primaryjoin="foreign(ThreadEntry.user_id) == User.id")
+
+class MessageThreadEntry(ThreadEntry):
+    """Message from the ticket owner or a collaborator"""
+    
+    __tablename__ = None  # single-table inheritance on ost_thread_entry
+    __mapper_args__ = {"polymorphic_identity": "M"}
+    
+    # Email metadata exists only for messages that arrived by email
+    email_info = relationship(
+        "ThreadEntryEmail",
+        primaryjoin="MessageThreadEntry.id == foreign(ThreadEntryEmail.thread_entry_id)",
+        uselist=False,
+        viewonly=True,
+    )
+
+class ResponseThreadEntry(ThreadEntry):
+    """Response from staff"""
+    
+    __tablename__ = None
+    __mapper_args__ = {"polymorphic_identity": "R"}
+
+class NoteThreadEntry(ThreadEntry):
+    """Internal note from staff"""
     
-    def __repr__(self):
-        return f"<ThreadEntry(id={self.id}, thread_id={self.thread_id}, type='{self.type}')>"
+    __tablename__ = None
+    __mapper_args__ = {"polymorphic_identity": "N"}
 
-class ThreadEntryEmail(OSTicketBase):
+class BounceThreadEntry(MessageThreadEntry):
+    """Bounce notice for an undeliverable outgoing email"""
+    
+    __tablename__ = None
+    __mapper_args__ = {"polymorphic_identity": "B"}
+
+class ThreadEntryEmail(OSTicketBase, ReprMixin):
     """Thread entry email model"""
     
     __tablename__ = "ost_thread_entry_email"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     thread_entry_id = Column(Integer, nullable=False)
-    email_id = Column(Integer, nullable=False, default=0)
-    mid = Column(String(255), nullable=False, default="")
+    email_id = int_column()
+    mid = str_column(255)
     headers = Column(Text, nullable=True)
-    
-    def __repr__(self):
-        return f"<ThreadEntryEmail(id={self.id}, thread_entry_id={self.thread_entry_id})>"
 
-class ThreadEntryMerge(OSTicketBase):
+class ThreadEntryMerge(OSTicketBase, ReprMixin):
     """Thread entry merge model"""
     
     __tablename__ = "ost_thread_entry_merge"
@@ -159,78 +294,141 @@ class ThreadEntryMerge(OSTicketBase):
     id = Column(Integer, primary_key=True, autoincrement=True)
     thread_entry_id = Column(Integer, nullable=False)
     data = Column(Text, nullable=True)
-    
-    def __repr__(self):
-        return f"<ThreadEntryMerge(id={self.id}, thread_entry_id={self.thread_entry_id})>"
 
-class ThreadEvent(OSTicketBase):
+class ThreadEvent(OSTicketBase, ReprMixin):
     """Thread event model"""
     
     __tablename__ = "ost_thread_event"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    thread_id = Column(Integer, nullable=False, default=0)
-    staff_id = Column(Integer, nullable=False, default=0)
-    team_id = Column(Integer, nullable=False, default=0)
-    dept_id = Column(Integer, nullable=False, default=0)
-    topic_id = Column(Integer, nullable=False, default=0)
+    thread_id = int_column()
+    staff_id = int_column()
+    team_id = int_column()
+    dept_id = int_column()
+    topic_id = int_column()
     event_id = Column(Integer, nullable=True)
-    username = Column(String(128), nullable=False, default="")
-    event = Column(String(255), nullable=False, default="")
+    username = str_column(128)
+    event = str_column(255)
     data = Column(String(1024), nullable=True)
     timestamp = Column(DateTime, nullable=False)
-    
-    def __repr__(self):
-        return f"<ThreadEvent(id={self.id}, thread_id={self.thread_id}, event='{self.event}')>"
 
-class ThreadReferral(OSTicketBase):
+class ThreadReferral(OSTicketBase, ReprMixin):
     """Thread referral model"""
     
     __tablename__ = "ost_thread_referral"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    thread_id = Column(Integer, nullable=False, default=0)
-    object_id = Column(Integer, nullable=False, default=0)
-    object_type = Column(String(1), nullable=False, default="T")
+    thread_id = int_column()
+    object_id = int_column()
+    object_type = str_column(1, "T")
     created = Column(DateTime, nullable=False)
-    
-    def __repr__(self):
-        return f"<ThreadReferral(id={self.id}, thread_id={self.thread_id}, object_id={self.object_id})>"
 
-class ThreadCollaborator(OSTicketBase):
+class ThreadCollaborator(OSTicketBase, TimestampMixin, ReprMixin):
     """Thread collaborator model"""
     
     __tablename__ = "ost_thread_collaborator"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    flags = Column(Integer, nullable=False, default=1)
-    thread_id = Column(Integer, nullable=False, default=0)
-    user_id = Column(Integer, nullable=False, default=0)
-    role = Column(String(1), nullable=False, default="M")  # M=message, N=note, R=reply
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
-    
-    def __repr__(self):
-        return f"<ThreadCollaborator(id={self.id}, thread_id={self.thread_id}, user_id={self.user_id})>"
+    flags = int_column(1)
+    thread_id = int_column()
+    user_id = int_column()
+    role = str_column(1, "M")  # M=message, N=note, R=reply
+    
+    # Relationships
+    thread = relationship(
+        "Thread",
+        primaryjoin="Thread.id == foreign(ThreadCollaborator.thread_id)",
+        back_populates="collaborators",
+    )
 
-class Note(OSTicketBase):
+class Note(OSTicketBase, TimestampMixin, ReprMixin):
     """Note model"""
     
     __tablename__ = "ost_note"
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     pid = Column(Integer, nullable=True)
-    staff_id = Column(Integer, nullable=False, default=0)
+    staff_id = int_column()
     ext_id = Column(String(10), nullable=True)
-    sort = Column(Integer, nullable=False, default=0)
-    types = Column(String(25), nullable=False, default="")
-    flags = Column(Integer, nullable=False, default=0)
-    status = Column(Integer, nullable=False, default=0)
-    title = Column(String(255), nullable=False, default="")
-    body = Column(Text, nullable=False)
-    extra = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
-    
-    def __repr__(self):
-        return f"<Note(id={self.id}, title='{self.title}')>"
\ No newline at end of file
+    sort = int_column()
+    types = str_column(25)
+    flags = int_column()
+    status = int_column()
+    title = str_column(255)
+    body = deferred(Column(Text, nullable=False), group="content")
+    extra = deferred(Column(Text, nullable=True), group="content")
+
+# Prebuilt statements for hot Ticket lookups, reused from the compiled cache
+_get_ticket_by_id = select(Ticket).where(Ticket.ticket_id == bindparam("id"))
+_get_ticket_by_number = select(Ticket).where(Ticket.number == bindparam("number"))
+_get_tickets_by_status = (
+    select(Ticket)
+    .where(Ticket.status_id == bindparam("sid"))
+    .order_by(Ticket.ticket_id)
+    .options(selectinload(Ticket.department), selectinload(Ticket.thread))
+)
+
+def list_ticket_rows(session: Session, **filters) -> List[Row]:
+    """Fetch ticket list columns as row tuples, filtered by Ticket column values
+    
+    Returns (ticket_id, number, status_id, staff_id, created) rows without
+    hydrating Ticket instances; detail views load the full model instead.
+    """
+    stmt = (
+        select(Ticket.ticket_id, Ticket.number, Ticket.status_id, Ticket.staff_id, Ticket.created)
+        .filter_by(**filters)
+        .order_by(Ticket.ticket_id)
+    )
+    return session.execute(stmt).all()
+
+_BULK_CHUNK_SIZE = 1000
+
+def _bulk_insert(session: Session, model, rows: list[dict]) -> None:
+    """Insert rows with executemany INSERTs of at most _BULK_CHUNK_SIZE rows; the caller commits"""
+    for start in range(0, len(rows), _BULK_CHUNK_SIZE):
+        session.execute(insert(model), rows[start:start + _BULK_CHUNK_SIZE])
+
+def bulk_add_thread_entries(session: Session, rows: list[dict]) -> None:
+    """Insert many thread entries without building ThreadEntry instances"""
+    _bulk_insert(session, ThreadEntry, rows)
+
+def bulk_add_thread_events(session: Session, rows: list[dict]) -> None:
+    """Insert many thread events without building ThreadEvent instances"""
+    _bulk_insert(session, ThreadEvent, rows)
+
+def ticket_list_query() -> Select:
+    """Build the ticket list statement with cdata columns and every used relationship preloaded
+    
+    raiseload("*") turns any relationship not named here into an error
+    instead of a silent per-row SELECT.
+    """
+    return select(Ticket).options(
+        undefer_group("cdata"),
+        selectinload(Ticket.department),
+        selectinload(Ticket.thread).selectinload(Thread.entries),
+        selectinload(Ticket.user),
+        selectinload(Ticket.staff),
+        selectinload(Ticket.team),
+        raiseload("*"),
+    )
+
+def thread_list_query() -> Select:
+    """Build the thread list statement with entries and collaborators preloaded"""
+    return select(Thread).options(
+        selectinload(Thread.entries).undefer_group("content"),
+        selectinload(Thread.collaborators),
+        raiseload("*"),
+    )
+
+def thread_entry_list_query() -> Select:
+    """Build the thread entry list statement with posters, bodies and email metadata preloaded"""
+    entry = with_polymorphic(ThreadEntry, [MessageThreadEntry])
+    return select(entry).options(
+        undefer_group("content"),
+        selectinload(entry.thread),
+        selectinload(entry.staff),
+        selectinload(entry.user),
+        selectinload(entry.MessageThreadEntry.email_info),
+        raiseload("*"),
+    )
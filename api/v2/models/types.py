@@ -0,0 +1,50 @@
+"""
+Custom column types for OSTicket API v2
+
+Type decorators for values osTicket stores in generic text columns.
+"""
+
+import ipaddress
+from typing import Any, Optional
+
+import orjson
+from sqlalchemy.types import Text, TypeDecorator, VARBINARY
+
+
+class OrjsonType(TypeDecorator):
+    """JSON document stored in a TEXT column, parsed once at load with orjson"""
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[str]:
+        if value is None:
+            return None
+        return orjson.dumps(value).decode()
+
+    def process_result_value(self, value: Optional[str], dialect) -> Any:
+        # osTicket leaves unset permission blobs as empty strings
+        if not value:
+            return None
+        return orjson.loads(value)
+
+
+class InetType(TypeDecorator):
+    """IPv4/IPv6 address packed to 4 or 16 bytes, the INET6_ATON() format"""
+
+    impl = VARBINARY(16)
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[bytes]:
+        if not value:
+            return None
+        try:
+            return ipaddress.ip_address(value).packed
+        except ValueError:
+            # Proxy headers can carry tokens like "unknown"; there is no address to keep
+            return None
+
+    def process_result_value(self, value: Optional[bytes], dialect) -> Optional[str]:
+        if value is None:
+            return None
+        return str(ipaddress.ip_address(value))
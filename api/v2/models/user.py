@@ -2,11 +2,11 @@
 User-related database models for OSTicket API v2
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, LargeBinary
-from sqlalchemy.orm import relationship
-from .base import OSTicketBase
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Index, LargeBinary, select
+from sqlalchemy.orm import deferred, relationship, selectinload, Session
+from .base import OSTicketBase, TimestampMixin
 
-class User(OSTicketBase):
+class User(OSTicketBase, TimestampMixin):
     """User model"""
     
     __tablename__ = "ost_user"
@@ -16,8 +16,36 @@ class User(OSTicketBase):
     default_email_id = Column(Integer, nullable=False, default=0)
     status = Column(Integer, nullable=False, default=0)
     name = Column(String(128), nullable=False)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    
+    # Relationships
+    organization = relationship(
+        "Organization",
+        primaryjoin="foreign(User.org_id) == Organization.id",
+        back_populates="users",
+    )
+    emails = relationship(
+        "UserEmail",
+        primaryjoin="User.id == foreign(UserEmail.user_id)",
+        back_populates="user",
+        order_by="UserEmail.id",
+    )
+    default_email = relationship(
+        "UserEmail",
+        primaryjoin="foreign(User.default_email_id) == UserEmail.id",
+        uselist=False,
+        viewonly=True,
+    )
+    account = relationship(
+        "UserAccount",
+        primaryjoin="User.id == foreign(UserAccount.user_id)",
+        back_populates="user",
+        uselist=False,
+    )
+    tickets = relationship(
+        "Ticket",
+        primaryjoin="User.id == foreign(Ticket.user_id)",
+        back_populates="user",
+    )
     
     def __repr__(self):
         return f"<User(id={self.id}, name='{self.name}')>"
@@ -40,12 +68,21 @@ class UserEmail(OSTicketBase):
     """User email model"""
     
     __tablename__ = "ost_user_email"
+    __table_args__ = (
+        # Covers the login join (address -> user_id) without a clustered-index lookup
+        Index("ix_user_email_lookup", "address", "user_id"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, nullable=False)
     flags = Column(Integer, nullable=False, default=0)
     address = Column(String(255), nullable=False, unique=True)
     
+    # Relationships
+    user = relationship(
+        "User", primaryjoin="User.id == foreign(UserEmail.user_id)", back_populates="emails"
+    )
+    
     def __repr__(self):
         return f"<UserEmail(id={self.id}, address='{self.address}')>"
 
@@ -55,20 +92,26 @@ class UserAccount(OSTicketBase):
     __tablename__ = "ost_user_account"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False, index=True)
     status = Column(Integer, nullable=False, default=0)
-    timezone = Column(String(64), nullable=True)
-    lang = Column(String(16), nullable=True)
+    timezone = deferred(Column(String(64), nullable=True), group="extras")
+    lang = deferred(Column(String(16), nullable=True), group="extras")
     username = Column(String(64), nullable=True, unique=True)
     passwd = Column(String(128), nullable=True)
     backend = Column(String(32), nullable=True)
-    extra = Column(Text, nullable=True)
-    registered = Column(DateTime, nullable=True)
+    # Not needed for login; loaded together on first access or via undefer_group("extras")
+    extra = deferred(Column(Text, nullable=True), group="extras")
+    registered = deferred(Column(DateTime, nullable=True), group="extras")
+    
+    # Relationships
+    user = relationship(
+        "User", primaryjoin="User.id == foreign(UserAccount.user_id)", back_populates="account"
+    )
     
     def __repr__(self):
         return f"<UserAccount(id={self.id}, username='{self.username}')>"
 
-class Organization(OSTicketBase):
+class Organization(OSTicketBase, TimestampMixin):
     """Organization model"""
     
     __tablename__ = "ost_organization"
@@ -79,8 +122,11 @@ class Organization(OSTicketBase):
     status = Column(Integer, nullable=False, default=0)
     domain = Column(String(128), nullable=False, default="")
     extra = Column(Text, nullable=True)
-    created = Column(DateTime, nullable=False)
-    updated = Column(DateTime, nullable=False)
+    
+    # Relationships
+    users = relationship(
+        "User", primaryjoin="foreign(User.org_id) == Organization.id", back_populates="organization"
+    )
     
     def __repr__(self):
         return f"<Organization(id={self.id}, name='{self.name}')>"
@@ -98,4 +144,18 @@ class OrganizationCData(OSTicketBase):
     notes = Column(Text, nullable=True)
     
     def __repr__(self):
-        return f"<OrganizationCData(org_id={self.org_id})>"
\ No newline at end of file
+        return f"<OrganizationCData(org_id={self.org_id})>"
+
+# Keeps each IN (...) list well inside max_allowed_packet and the planner's range limits
+_IN_CHUNK_SIZE = 500
+
+def load_users_with_org_and_email(session: Session, user_ids: list[int]) -> list[User]:
+    """Fetch users with their organization and default email, one IN query per chunk and relationship"""
+    users: list[User] = []
+    for start in range(0, len(user_ids), _IN_CHUNK_SIZE):
+        users.extend(session.scalars(
+            select(User)
+            .where(User.id.in_(user_ids[start:start + _IN_CHUNK_SIZE]))
+            .options(selectinload(User.default_email), selectinload(User.organization))
+        ))
+    return users
@@ -2,56 +2,82 @@
 Authentication endpoints for OSTicket API v2
 """
 
+from operator import attrgetter
+from typing import Optional
 from fastapi import APIRouter, Depends, Request
 from ..middleware.auth import get_auth, require_auth, require_staff, require_admin, AuthContext
-from ..schemas.base import SuccessResponse
+from ..schemas.base import OSTicketBase, SuccessResponse
 
 router = APIRouter()
 
+class StaffInfo(OSTicketBase):
+    staff_id: int
+    username: str
+    firstname: Optional[str] = None
+    lastname: Optional[str] = None
+    email: Optional[str] = None
+    dept_id: int
+    role_id: int
+    isactive: bool
+    isadmin: bool
+
+class UserInfo(OSTicketBase):
+    id: int
+    name: str
+    org_id: int
+    status: int
+
+class ApiKeyInfo(OSTicketBase):
+    id: int
+    can_create_tickets: bool
+    can_exec_cron: bool
+
+# Field names and a single C-level getter for each nested info model
+_GETTERS = {
+    model: (tuple(model.model_fields), attrgetter(*model.model_fields))
+    for model in (StaffInfo, UserInfo, ApiKeyInfo)
+}
+
+def _construct(model, obj):
+    """Copy model's fields off a trusted ORM object without re-validating them"""
+    if obj is None:
+        return None
+    names, getter = _GETTERS[model]
+    return model.model_construct(**dict(zip(names, getter(obj))))
+
+class CurrentUserResponse(OSTicketBase):
+    auth_type: str
+    is_authenticated: bool
+    is_staff: bool
+    is_admin: bool
+    staff: Optional[StaffInfo] = None
+    user: Optional[UserInfo] = None
+    api_key: Optional[ApiKeyInfo] = None
+    
+    @classmethod
+    def from_auth_context(cls, auth: AuthContext) -> "CurrentUserResponse":
+        """Build the response from an authenticated request's context"""
+        return cls.model_construct(
+            auth_type=auth.auth_type,
+            is_authenticated=auth.is_authenticated,
+            is_staff=auth.is_staff,
+            is_admin=auth.is_admin,
+            staff=_construct(StaffInfo, auth.staff),
+            user=_construct(UserInfo, auth.user),
+            api_key=_construct(ApiKeyInfo, auth.api_key),
+        )
+
 @router.get(
     "/me",
+    response_model=CurrentUserResponse,
+    response_model_exclude_none=True,
     summary="Get Current User/Staff Info",
     description="Get information about the currently authenticated user or staff member"
 )
 async def get_current_user(auth: AuthContext = Depends(require_auth)):
     """Get current authenticated user information"""
     
-    response_data = {
-        "auth_type": auth.auth_type,
-        "is_authenticated": auth.is_authenticated,
-        "is_staff": auth.is_staff,
-        "is_admin": auth.is_admin,
-    }
-    
-    if auth.staff:
-        response_data["staff"] = {
-            "staff_id": auth.staff.staff_id,
-            "username": auth.staff.username,
-            "firstname": auth.staff.firstname,
-            "lastname": auth.staff.lastname,
-            "email": auth.staff.email,
-            "dept_id": auth.staff.dept_id,
-            "role_id": auth.staff.role_id,
-            "isactive": auth.staff.isactive,
-            "isadmin": auth.staff.isadmin,
-        }
-    
-    if auth.user:
-        response_data["user"] = {
-            "id": auth.user.id,
-            "name": auth.user.name,
-            "org_id": auth.user.org_id,
-            "status": auth.user.status,
-        }
-    
-    if auth.api_key:
-        response_data["api_key"] = {
-            "id": auth.api_key.id,
-            "can_create_tickets": auth.api_key.can_create_tickets,
-            "can_exec_cron": auth.api_key.can_exec_cron,
-        }
-    
-    return response_data
+    return CurrentUserResponse.from_auth_context(auth)
 
 @router.get(
     "/check",
@@ -3,17 +3,19 @@ Extended authentication endpoints for OSTicket API v2
 Multi-provider authentication: OSTicket native, Keycloak, Microsoft Entra
 """
 
+import re
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
-from fastapi.responses import RedirectResponse
-from pydantic import BaseModel, EmailStr
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse, RedirectResponse
+from pydantic import BaseModel, field_validator
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..core.database import get_db
+from ..core.database import get_async_db
 from ..core.auth import AuthenticationService
-from ..core.exceptions import AuthenticationError
-from ..core.oauth2 import oauth2_manager, OAuth2Provider
+from ..core.exceptions import AuthenticationError, NotFoundError, ValidationError
+from ..core.oauth2 import oauth2_manager, OAuth2Provider, STATE_COOKIE, STATE_MAX_AGE
 from ..models.auth import ExternalIdentity
 from ..middleware.auth import require_auth, get_user_info_dict
 import structlog
@@ -21,14 +23,31 @@ import structlog
 logger = structlog.get_logger()
 router = APIRouter(prefix="/auth", tags=["extended-authentication"])
 
+# Loggers pre-bound per flow so login handlers don't rebuild the context each call.
+# get_logger() proxies bind on first use, after main.py has configured structlog.
+_staff_login_logger = structlog.get_logger(action="staff_login")
+_user_login_logger = structlog.get_logger(action="user_login")
+_oauth2_login_logger = structlog.get_logger(action="oauth2_login")
+_oauth2_callback_logger = structlog.get_logger(action="oauth2_callback")
+
+_EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
 # Request/Response Models
 class StaffLoginRequest(BaseModel):
     username: str
     password: str
 
 class UserLoginRequest(BaseModel):
-    email: EmailStr
+    email: str
     password: str
+    
+    @field_validator('email')
+    @classmethod
+    def check_email(cls, v):
+        # Shape check only - the lookup against ost_user_email is the real validation
+        if not _EMAIL_RE.fullmatch(v):
+            raise ValueError("value is not a valid email address")
+        return v
 
 class AuthTokenResponse(BaseModel):
     access_token: str
@@ -51,20 +70,20 @@ class UserInfoResponse(BaseModel):
 async def staff_login(
     credentials: StaffLoginRequest,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Authenticate staff user with username/password"""
     try:
         auth_service = AuthenticationService(db)
         
         # Authenticate staff
-        auth_result = auth_service.authenticate_staff(
+        auth_result = await auth_service.authenticate_staff(
             credentials.username, 
             credentials.password
         )
         
         if not auth_result:
-            logger.warning("Staff login failed", username=credentials.username)
+            _staff_login_logger.warning("Staff login failed", username=credentials.username)
             raise AuthenticationError("Invalid username or password")
         
         # Create tokens
@@ -74,9 +93,9 @@ async def staff_login(
             user_agent=request.headers.get("User-Agent")
         )
         
-        logger.info("Staff login successful", 
-                   staff_id=auth_result["user_id"], 
-                   username=auth_result["username"])
+        _staff_login_logger.info("Staff login successful", 
+                                staff_id=auth_result["user_id"], 
+                                username=auth_result["username"])
         
         return AuthTokenResponse(
             access_token=tokens["access_token"],
@@ -88,27 +107,27 @@ async def staff_login(
     except AuthenticationError:
         raise
     except Exception as e:
-        logger.error("Staff login error", error=str(e))
+        _staff_login_logger.error("Staff login error", error=str(e))
         raise AuthenticationError("Login failed")
 
 @router.post("/user/login", response_model=AuthTokenResponse) 
 async def user_login(
     credentials: UserLoginRequest,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Authenticate end user with email/password"""
     try:
         auth_service = AuthenticationService(db)
         
         # Authenticate user
-        auth_result = auth_service.authenticate_user(
+        auth_result = await auth_service.authenticate_user(
             credentials.email,
             credentials.password
         )
         
         if not auth_result:
-            logger.warning("User login failed", email=credentials.email)
+            _user_login_logger.warning("User login failed", email=credentials.email)
             raise AuthenticationError("Invalid email or password")
         
         # Create tokens
@@ -118,9 +137,9 @@ async def user_login(
             user_agent=request.headers.get("User-Agent")
         )
         
-        logger.info("User login successful", 
-                   user_id=auth_result["user_id"],
-                   email=auth_result["email"])
+        _user_login_logger.info("User login successful", 
+                               user_id=auth_result["user_id"],
+                               email=auth_result["email"])
         
         return AuthTokenResponse(
             access_token=tokens["access_token"],
@@ -132,7 +151,7 @@ async def user_login(
     except AuthenticationError:
         raise
     except Exception as e:
-        logger.error("User login error", error=str(e))
+        _user_login_logger.error("User login error", error=str(e))
         raise AuthenticationError("Login failed")
 
 # OAuth2/OIDC Endpoints
@@ -153,20 +172,27 @@ async def oauth2_login(
         # Build redirect URI
         redirect_uri = str(request.url_for("oauth2_callback", provider=provider))
         
-        # Generate state parameter (optionally include return URL)
-        state = oauth_provider.generate_state()
-        if return_url:
-            # Store return URL in state (in production, use encrypted state)
-            state = f"{state}:{return_url}"
+        # Generate signed state parameter (optionally carrying the return URL)
+        state, nonce = oauth_provider.generate_state(return_url)
         
         # Get authorization URL
         auth_url = await oauth_provider.get_authorization_url(redirect_uri, state)
         
-        logger.info("OAuth2 login initiated", provider=provider, state=state[:16] + "...")
-        return RedirectResponse(url=auth_url)
+        _oauth2_login_logger.info("OAuth2 login initiated", provider=provider, state=state[:16] + "...")
+        response = RedirectResponse(url=auth_url)
+        # Bind the state to this browser; lax so the IdP's redirect back still sends it
+        response.set_cookie(
+            STATE_COOKIE, nonce,
+            max_age=STATE_MAX_AGE,
+            path=request.url_for("oauth2_callback", provider=provider).path,
+            secure=request.url.scheme == "https",
+            httponly=True,
+            samesite="lax",
+        )
+        return response
         
     except Exception as e:
-        logger.error("OAuth2 login initiation failed", provider=provider, error=str(e))
+        _oauth2_login_logger.error("OAuth2 login initiation failed", provider=provider, error=str(e))
         from ..core.exceptions import APIException
         raise APIException("OAuth2 login failed")
 
@@ -177,24 +203,30 @@ async def oauth2_callback(
     code: Optional[str] = None,
     state: Optional[str] = None,
     error: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Handle OAuth2 callback from external provider"""
     try:
         if error:
-            logger.warning("OAuth2 callback received error", provider=provider, error=error)
-            from ..core.exceptions import ValidationError
+            _oauth2_callback_logger.warning("OAuth2 callback received error", provider=provider, error=error)
             raise ValidationError(f"OAuth2 authentication failed: {error}")
         
         if not code:
-            from ..core.exceptions import ValidationError
             raise ValidationError("Authorization code not provided")
         
         oauth_provider = oauth2_manager.get_provider(provider)
         if not oauth_provider:
-            from ..core.exceptions import NotFoundError
             raise NotFoundError("OAuth Provider", provider)
         
+        # Verify the signed state before spending the code
+        if not state:
+            raise ValidationError("State parameter not provided")
+        try:
+            return_url = oauth_provider.parse_state(state, request.cookies.get(STATE_COOKIE))
+        except ValueError as e:
+            _oauth2_callback_logger.warning("OAuth2 callback state rejected", provider=provider, reason=str(e))
+            raise ValidationError("Invalid OAuth2 state")
+        
         # Exchange code for tokens
         redirect_uri = str(request.url_for("oauth2_callback", provider=provider))
         token_data = await oauth_provider.exchange_code_for_token(code, redirect_uri, state)
@@ -204,13 +236,13 @@ async def oauth2_callback(
         
         # Authenticate using external identity (IdP verifies identity, roles internal)
         auth_service = AuthenticationService(db)
-        auth_result = auth_service.authenticate_external_identity(provider, user_data)
+        auth_result = await auth_service.authenticate_external_identity(provider, user_data)
         
         if not auth_result:
             # No mapping exists - return error or redirect to mapping page
-            logger.warning("External identity not mapped", 
-                          provider=provider, 
-                          external_user_id=user_data.get("id"))
+            _oauth2_callback_logger.warning("External identity not mapped", 
+                                           provider=provider, 
+                                           external_user_id=user_data.get("id"))
             raise AuthenticationError("External identity not linked to OSTicket account")
         
         # Create JWT tokens for the mapped OSTicket user
@@ -220,18 +252,11 @@ async def oauth2_callback(
             user_agent=request.headers.get("User-Agent")
         )
         
-        logger.info("OAuth2 authentication successful",
-                   provider=provider,
-                   external_user_id=user_data.get("id"),
-                   osticket_user_type=auth_result["user_type"],
-                   osticket_user_id=auth_result["user_id"])
-        
-        # Extract return URL from state if present
-        return_url = None
-        if state and ":" in state:
-            state_parts = state.split(":", 1)
-            if len(state_parts) == 2:
-                return_url = state_parts[1]
+        _oauth2_callback_logger.info("OAuth2 authentication successful",
+                                    provider=provider,
+                                    external_user_id=user_data.get("id"),
+                                    osticket_user_type=auth_result["user_type"],
+                                    osticket_user_id=auth_result["user_id"])
         
         # For now, return tokens as JSON (in production, might set cookies and redirect)
         response_data = {
@@ -242,12 +267,14 @@ async def oauth2_callback(
             "return_url": return_url
         }
         
-        return response_data
+        response = ORJSONResponse(response_data)
+        response.delete_cookie(STATE_COOKIE, path=request.url.path)
+        return response
         
     except (AuthenticationError, ValidationError, NotFoundError):
         raise
     except Exception as e:
-        logger.error("OAuth2 callback error", provider=provider, error=str(e))
+        _oauth2_callback_logger.error("OAuth2 callback error", provider=provider, error=str(e))
         from ..core.exceptions import APIException
         raise APIException("OAuth2 authentication failed")
 
@@ -296,26 +323,7 @@ async def logout(request: Request, user_info: dict = Depends(require_auth)):
 async def get_enabled_providers():
     """Get list of enabled authentication providers"""
     try:
-        providers = oauth2_manager.get_enabled_providers()
-        
-        provider_info = {}
-        for name, provider in providers.items():
-            provider_info[name] = {
-                "name": name,
-                "login_url": f"/api/v2/auth/oauth2/{name}/login"
-            }
-        
-        # Add OSTicket native authentication
-        provider_info["osticket"] = {
-            "name": "osticket",
-            "staff_login_url": "/api/v2/auth/staff/login",
-            "user_login_url": "/api/v2/auth/user/login"
-        }
-        
-        return {
-            "providers": provider_info,
-            "native_auth_enabled": True
-        }
+        return _provider_info()
         
     except Exception as e:
         logger.error("Get providers error", error=str(e))
@@ -324,23 +332,56 @@ async def get_enabled_providers():
 
 # Helper Functions
 
-def _get_client_ip(request: Request) -> str:
-    """Get client IP address from request"""
-    # Check for forwarded headers first (reverse proxy)
-    forwarded_for = request.headers.get("X-Forwarded-For")
-    if forwarded_for:
-        return forwarded_for.split(",")[0].strip()
+@lru_cache(maxsize=1)
+def _provider_info() -> Dict[str, Any]:
+    """Build the providers response once; providers are fixed at startup"""
+    providers = oauth2_manager.get_enabled_providers()
+    
+    provider_info = {}
+    for name, provider in providers.items():
+        provider_info[name] = {
+            "name": name,
+            "login_url": f"/api/v2/auth/oauth2/{name}/login"
+        }
     
-    forwarded = request.headers.get("X-Forwarded")
-    if forwarded:
-        return forwarded.strip()
+    # Add OSTicket native authentication
+    provider_info["osticket"] = {
+        "name": "osticket",
+        "staff_login_url": "/api/v2/auth/staff/login",
+        "user_login_url": "/api/v2/auth/user/login"
+    }
+    
+    return {
+        "providers": provider_info,
+        "native_auth_enabled": True
+    }
+
+# Proxy headers in order of preference; ASGI servers deliver raw names lowercased
+_PROXY_IP_HEADERS = (b"x-forwarded-for", b"x-forwarded", b"x-real-ip")
+
+def _get_client_ip(request: Request) -> str:
+    """Get client IP address from request, resolved once per request"""
+    client_ip = getattr(request.state, "client_ip", None)
+    if client_ip is not None:
+        return client_ip
     
-    real_ip = request.headers.get("X-Real-IP")
-    if real_ip:
-        return real_ip.strip()
+    # Collect the first value of each proxy header in one pass over the raw headers
+    found = {}
+    for name, value in request.headers.raw:
+        if name in _PROXY_IP_HEADERS and name not in found:
+            found[name] = value
     
-    # Fall back to direct client IP
-    if hasattr(request.client, 'host'):
-        return request.client.host
+    for name in _PROXY_IP_HEADERS:
+        value = found.get(name)
+        if value:
+            if name == b"x-forwarded-for":
+                # First address in the chain is the original client
+                value = value.split(b",", 1)[0]
+            client_ip = value.strip().decode("latin-1")
+            break
+    else:
+        # Fall back to direct client IP
+        client_ip = request.client.host if request.client else "unknown"
     
-    return "unknown"
\ No newline at end of file
+    request.state.client_ip = client_ip
+    return client_ip
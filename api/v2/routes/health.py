@@ -2,32 +2,69 @@
 Health check endpoints for OSTicket API v2
 """
 
-from fastapi import APIRouter, Depends
+import asyncio
+from typing import Optional
+from fastapi import APIRouter
 from datetime import datetime
-from sqlalchemy.orm import Session
-from ..core.database import get_db, get_db_health
+from ..core.database import get_db_health
 from ..schemas.base import HealthResponse
 
 router = APIRouter()
 
+# Probes can arrive every second; a background task refreshes the answer this often
+HEALTH_REFRESH_SECONDS = 5.0
+_cached_db_health: Optional[dict] = None
+_cached_health_response: Optional[HealthResponse] = None
+_refresh_task: Optional[asyncio.Task] = None
+
+def _refresh_health() -> HealthResponse:
+    """Run the database check and rebuild the cached health response"""
+    global _cached_db_health, _cached_health_response
+    db_health = get_db_health()
+    _cached_db_health = db_health
+    _cached_health_response = HealthResponse(
+        status="healthy" if db_health["status"] == "healthy" else "unhealthy",
+        timestamp=datetime.utcnow(),
+        version="2.0.0",
+        database=db_health
+    )
+    return _cached_health_response
+
+async def _refresh_health_loop():
+    """Keep the cached health response fresh until cancelled"""
+    while True:
+        # get_db_health blocks on the sync engine, so keep it off the event loop
+        await asyncio.to_thread(_refresh_health)
+        await asyncio.sleep(HEALTH_REFRESH_SECONDS)
+
+def start_health_refresh() -> None:
+    """Start the background health refresh task - call from app startup"""
+    global _refresh_task
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_health_loop())
+
+async def stop_health_refresh() -> None:
+    """Cancel the background health refresh task - call from app shutdown"""
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
+
 @router.get(
     "/health",
     response_model=HealthResponse,
     summary="Health Check",
     description="Check the health status of the API and its dependencies"
 )
-async def health_check(db: Session = Depends(get_db)):
+async def health_check():
     """Health check endpoint"""
     
-    # Get database health information
-    db_health = get_db_health()
-    
-    return HealthResponse(
-        status="healthy" if db_health["status"] == "healthy" else "unhealthy",
-        timestamp=datetime.utcnow(),
-        version="2.0.0",
-        database=db_health
-    )
+    # Only the very first probe after startup can find the cache empty
+    return _cached_health_response or await asyncio.to_thread(_refresh_health)
 
 @router.get(
     "/health/database",
@@ -37,4 +74,6 @@ async def health_check(db: Session = Depends(get_db)):
 async def database_health_check():
     """Database-specific health check"""
     
-    return get_db_health()
\ No newline at end of file
+    if _cached_db_health is None:
+        await asyncio.to_thread(_refresh_health)
+    return _cached_db_health
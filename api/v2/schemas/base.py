@@ -14,7 +14,8 @@ class OSTicketBase(BaseModel):
         populate_by_name=True,
         use_enum_values=True,
         validate_assignment=True,
-        str_strip_whitespace=True
+        str_strip_whitespace=True,
+        defer_build=False  # Build validators at import, not on a worker's first request
     )
 
 class TimestampSchema(BaseModel):
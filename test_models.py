@@ -3,109 +3,157 @@
 Test script to verify SQLAlchemy models work with OSTicket database
 """
 
+import argparse
+import asyncio
 import sys
 import os
+import time
+import traceback
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from api.v2.core.database import SessionLocal
+from sqlalchemy import bindparam, func, select, text
+from api.v2.core.database import AsyncSessionLocal, async_engine, check_statement_cache, count_queries
 from api.v2.models import (
     Staff, Department, User, UserEmail, UserAccount, Organization,
     Ticket, TicketStatus, Config, ApiKey
 )
+from api.v2.models.ticket import ticket_list_query
 
-def test_models():
+# (label, model, sampled columns, plural noun, sample formatter) - one entry per
+# probed model; only the columns a formatter prints are fetched
+PROBES = [
+    ("Config", Config,
+     (Config.namespace, Config.key, func.substr(Config.value, 1, 50).label("value")),
+     "config entries",
+     lambda c: f"Sample config: {c.namespace}.{c.key} = {c.value}..."),
+    ("Staff", Staff, (Staff.username, Staff.staff_id, Staff.isactive), "staff members",
+     lambda s: f"Sample staff: {s.username} (ID: {s.staff_id}, Active: {s.isactive})"),
+    ("Department", Department, (Department.name, Department.id, Department.ispublic), "departments",
+     lambda d: f"Sample department: {d.name} (ID: {d.id}, Public: {d.ispublic})"),
+    ("User", User, (User.name, User.id, User.status), "users",
+     lambda u: f"Sample user: {u.name} (ID: {u.id}, Status: {u.status})"),
+    ("UserEmail", UserEmail, (UserEmail.address, UserEmail.user_id), "user emails",
+     lambda e: f"Sample user email: {e.address} (User ID: {e.user_id})"),
+    ("Ticket", Ticket, (Ticket.number, Ticket.ticket_id, Ticket.status_id), "tickets",
+     lambda t: f"Sample ticket: #{t.number} (ID: {t.ticket_id}, Status: {t.status_id})"),
+    ("TicketStatus", TicketStatus, (TicketStatus.name, TicketStatus.id, TicketStatus.state), "ticket statuses",
+     lambda s: f"Sample status: {s.name} (ID: {s.id}, State: {s.state})"),
+    ("ApiKey", ApiKey, (ApiKey.ipaddr, ApiKey.isactive), "API keys",
+     lambda k: f"Sample API key: {k.ipaddr} (Active: {k.isactive})"),
+]
+
+# The table above unzipped into parallel tuples indexed by probe position
+LABELS, MODELS, COLUMNS, NOUNS, FORMATTERS = zip(*PROBES)
+TABLE_NAMES = tuple(model.__table__.name for model in MODELS)
+
+# Built once so each probe reuses the same statement object (and its cache key).
+# The probes select plain columns through Core: nothing is mutated, so there
+# is no need for ORM instances, identity-map bookkeeping or relationship loaders.
+SAMPLE_STMTS = tuple(select(*columns).limit(1) for columns in COLUMNS)
+EXACT_STMTS = tuple(select(*columns, func.count().over().label("n")).limit(1) for columns in COLUMNS)
+
+# InnoDB's per-table row estimates for every probed table in one O(1) lookup
+APPROX_COUNT_STMT = text(
+    "SELECT table_name, table_rows FROM information_schema.tables "
+    "WHERE table_schema = DATABASE() AND table_name IN :names"
+).bindparams(bindparam("names", list(TABLE_NAMES), expanding=True))
+
+# A ticket list page must cost the same number of statements however many
+# rows it returns: the tickets plus one SELECT per preloaded relationship
+TICKET_LIST_PAGE = 50
+TICKET_LIST_MAX_QUERIES = 7  # tickets, department, thread, entries, user, staff, team
+
+async def probe(i, exact):
+    """Fetch one sample row of probe i's table, plus its exact row count if requested
+    
+    Each probe uses its own connection so gather() can overlap them.
+    """
+    async with async_engine.connect() as conn:
+        if not exact:
+            return (await conn.execute(SAMPLE_STMTS[i])).first(), None
+        # COUNT(*) OVER () returns the total alongside the sample row
+        row = (await conn.execute(EXACT_STMTS[i])).first()
+    return (row, row.n) if row else (None, 0)
+
+async def approx_counts():
+    """Get estimated row counts keyed by table name"""
+    async with async_engine.connect() as conn:
+        return {name: rows or 0 for name, rows in await conn.execute(APPROX_COUNT_STMT)}
+
+async def ticket_list_queries():
+    """Load a page of tickets as list endpoints do; return (tickets, statements)"""
+    async with AsyncSessionLocal() as session:
+        with count_queries(async_engine.sync_engine) as statements:
+            tickets = (await session.scalars(ticket_list_query().limit(TICKET_LIST_PAGE))).all()
+            for ticket in tickets:
+                ticket.department, ticket.thread, ticket.user, ticket.staff, ticket.team
+    return len(tickets), len(statements)
+
+async def test_models(exact=False):
     """Test that models can query the database successfully"""
-    db = SessionLocal()
+    # Collect the report and write it with a single call at the end
+    out = []
+    emit = out.append
     
     try:
-        print("Testing SQLAlchemy models with OSTicket database...\n")
-        
-        # Test Config model
-        print("1. Testing Config model...")
-        config_count = db.query(Config).count()
-        print(f"   Found {config_count} config entries")
-        
-        if config_count > 0:
-            config = db.query(Config).first()
-            print(f"   Sample config: {config.namespace}.{config.key} = {config.value[:50]}...")
-        
-        # Test Staff model
-        print("\n2. Testing Staff model...")
-        staff_count = db.query(Staff).count()
-        print(f"   Found {staff_count} staff members")
-        
-        if staff_count > 0:
-            staff = db.query(Staff).first()
-            print(f"   Sample staff: {staff.username} (ID: {staff.staff_id}, Active: {staff.isactive})")
-        
-        # Test Department model
-        print("\n3. Testing Department model...")
-        dept_count = db.query(Department).count()
-        print(f"   Found {dept_count} departments")
-        
-        if dept_count > 0:
-            dept = db.query(Department).first()
-            print(f"   Sample department: {dept.name} (ID: {dept.id}, Public: {dept.ispublic})")
-        
-        # Test User model
-        print("\n4. Testing User model...")
-        user_count = db.query(User).count()
-        print(f"   Found {user_count} users")
-        
-        if user_count > 0:
-            user = db.query(User).first()
-            print(f"   Sample user: {user.name} (ID: {user.id}, Status: {user.status})")
-        
-        # Test UserEmail model
-        print("\n5. Testing UserEmail model...")
-        user_email_count = db.query(UserEmail).count()
-        print(f"   Found {user_email_count} user emails")
-        
-        if user_email_count > 0:
-            user_email = db.query(UserEmail).first()
-            print(f"   Sample user email: {user_email.address} (User ID: {user_email.user_id})")
-        
-        # Test Ticket model
-        print("\n6. Testing Ticket model...")
-        ticket_count = db.query(Ticket).count()
-        print(f"   Found {ticket_count} tickets")
-        
-        if ticket_count > 0:
-            ticket = db.query(Ticket).first()
-            print(f"   Sample ticket: #{ticket.number} (ID: {ticket.ticket_id}, Status: {ticket.status_id})")
-        
-        # Test TicketStatus model
-        print("\n7. Testing TicketStatus model...")
-        status_count = db.query(TicketStatus).count()
-        print(f"   Found {status_count} ticket statuses")
-        
-        if status_count > 0:
-            status = db.query(TicketStatus).first()
-            print(f"   Sample status: {status.name} (ID: {status.id}, State: {status.state})")
-        
-        # Test ApiKey model
-        print("\n8. Testing ApiKey model...")
-        api_key_count = db.query(ApiKey).count()
-        print(f"   Found {api_key_count} API keys")
-        
-        if api_key_count > 0:
-            api_key = db.query(ApiKey).first()
-            print(f"   Sample API key: {api_key.ipaddr} (Active: {api_key.isactive})")
-        
-        print("\n✅ All model queries completed successfully!")
-        print("✅ SQLAlchemy models are working correctly with the OSTicket database!")
+        emit("Testing SQLAlchemy models with OSTicket database...\n")
+        
+        # Third-party dialects that don't opt in silently compile every statement
+        check_statement_cache()
+        
+        # Open one pooled connection per probe up front so the timing excludes handshakes
+        warm = await asyncio.gather(*(async_engine.connect().start() for _ in LABELS))
+        await asyncio.gather(*(conn.close() for conn in warm))
+        started = time.perf_counter()
+        
+        # Exact counts scan every table; by default settle for the estimates
+        probes = asyncio.gather(*(probe(i, exact) for i in range(len(LABELS))))
+        if exact:
+            results, estimates = await probes, {}
+        else:
+            results, estimates = await asyncio.gather(probes, approx_counts())
+        
+        for i in range(len(LABELS)):
+            sample, count = results[i]
+            if i:
+                emit("")
+            emit(f"{i + 1}. Testing {LABELS[i]} model...")
+            if exact:
+                emit(f"   Found {count} {NOUNS[i]}")
+            else:
+                emit(f"   Found ~{estimates.get(TABLE_NAMES[i], 0)} {NOUNS[i]}")
+            
+            # Estimates can lag behind the table, so the sample row decides
+            if sample is not None:
+                emit(f"   {FORMATTERS[i](sample)}")
+        
+        emit(f"\n{len(LABELS) + 1}. Testing ticket list loading...")
+        tickets, queries = await ticket_list_queries()
+        emit(f"   Loaded {tickets} tickets with relationships in {queries} queries")
+        if queries > TICKET_LIST_MAX_QUERIES:
+            raise AssertionError(f"ticket list took {queries} queries, expected at most {TICKET_LIST_MAX_QUERIES}")
+        
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        emit(f"\n✅ All model queries completed successfully in {elapsed_ms:.1f} ms!")
+        emit("✅ SQLAlchemy models are working correctly with the OSTicket database!")
         
     except Exception as e:
-        print(f"\n❌ Error testing models: {str(e)}")
-        import traceback
+        emit(f"\n❌ Error testing models: {str(e)}")
         traceback.print_exc()
         return False
         
     finally:
-        db.close()
+        sys.stdout.write("\n".join(out) + "\n")
+        sys.stdout.flush()
+        await async_engine.dispose()
     
     return True
 
 if __name__ == "__main__":
-    success = test_models()
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--exact", action="store_true",
+                        help="report exact COUNT(*) totals instead of InnoDB row estimates")
+    args = parser.parse_args()
+    
+    success = asyncio.run(test_models(exact=args.exact))
+    sys.exit(0 if success else 1)